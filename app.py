@@ -15,10 +15,23 @@ sys.path.insert(0, str(root / "app"))
 import agent
 import document_processor
 
-health_agent = agent.HealthAgent()
-doc_processor = document_processor.DocumentProcessor()
+_health_agent = None
+_doc_processor = None
 uploaded_docs = []
 
+def get_health_agent():
+    """HealthAgent built on first use (keeps cold start short)"""
+    global _health_agent
+    if _health_agent is None:
+        _health_agent = agent.HealthAgent()
+    return _health_agent
+
+def get_doc_processor():
+    global _doc_processor
+    if _doc_processor is None:
+        _doc_processor = document_processor.DocumentProcessor()
+    return _doc_processor
+
 # Rate limiting
 user_requests = defaultdict(list)
 MAX_REQUESTS_PER_HOUR = 20
@@ -62,7 +75,7 @@ def handle_file_upload(files):
     
     for file in file_list:
         try:
-            content = doc_processor.process_file(file.name)
+            content = get_doc_processor().process_file(file.name)
             uploaded_docs.append({
                 'name': Path(file.name).name,
                 'content': content
@@ -106,7 +119,7 @@ def chat_fn(message, history):
             content.extend(doc['content'])
         
         response = ""
-        for thinking, answer in health_agent.chat_with_vision(content):
+        for thinking, answer in get_health_agent().chat_with_vision(content):
             response = answer if not thinking else f"**Thinking:** {thinking}\n\n{answer}"
         
         history.append((message, response))
@@ -114,7 +127,7 @@ def chat_fn(message, history):
     
     # Regular chat
     response = ""
-    for thinking, answer in health_agent.chat(message):
+    for thinking, answer in get_health_agent().chat(message):
         response = answer if not thinking else f"**Thinking:** {thinking}\n\n{answer}"
     
     history.append((message, response))
@@ -1,8 +1,10 @@
-from typing import List, Dict, Generator, Tuple
+from typing import List, Dict, Generator, Optional, Tuple
 try:
     from .llm import LLMClient
+    from .history import ConversationHistory
 except ImportError:
     from llm import LLMClient
+    from history import ConversationHistory
 
 SYSTEM_PROMPT = """You are PixelCare AI, a compassionate and knowledgeable health companion assistant designed to empower users with health insights.
 
@@ -77,24 +79,75 @@ Remember: Your goal is to bridge the gap between raw health data and meaningful
 class HealthAgent:
     def __init__(self):
         self.llm = LLMClient()
-        self.history: List[Dict[str, str]] = [
-            {"role": "system", "content": SYSTEM_PROMPT}
-        ]
+        # Bounded: old document images become references, old turns a summary
+        self.history = ConversationHistory(SYSTEM_PROMPT)
+        self.tool_calls: List[Dict] = []  # Tool calls requested by the last reply, awaiting tool_results()
+        self.tools: Optional[List[Dict]] = None  # Last tools offered; resent while the history refers to them
     
-    def chat(self, message: str) -> Generator[Tuple[str, str], None, None]:
-        """Returns (thinking, response) tuples - handles both OpenAI reasoning and <think> tags"""
-        self.history.append({"role": "user", "content": message})
+    def chat(self, message: str, tools: Optional[List[Dict]] = None) -> Generator[Tuple[str, str], None, None]:
+        """Returns (thinking, response) tuples - handles both OpenAI reasoning and <think> tags.
         
-        response = self.llm.chat(self.history, stream=True)
+        With tools, the same streamed call may end in tool calls instead of (or after) text;
+        they are left in self.tool_calls for the caller to run and answer with tool_results().
+        """
+        self._answer_tool_calls({}, "The tool call was cancelled before it returned a result.")
+        self.history.add_user(message)
+        if tools:
+            self.tools = tools
+        yield from self._stream(tools)
+    
+    def chat_with_vision(self, content: list) -> Generator[Tuple[str, str], None, None]:
+        """Chat with vision content (images/documents)"""
+        self._answer_tool_calls({}, "The tool call was cancelled before it returned a result.")
+        self.history.add_user(content)
+        yield from self._stream()
+    
+    def tool_results(self, results: Dict[str, str]) -> Generator[Tuple[str, str], None, None]:
+        """Answer the pending tool calls ({tool_call_id: content}) and stream the model's follow-up.
+        
+        The follow-up offers the same tools (the history now refers to them) but with
+        tool_choice='none', so the model answers instead of calling again.
+        """
+        self._answer_tool_calls(results)
+        yield from self._stream()
+    
+    def _answer_tool_calls(self, results: Dict[str, str], missing: Optional[str] = None):
+        """Append a tool message for every pending call, so no assistant tool_calls entry is left unanswered
+        (e.g. when the UI dropped the generator while the tool was running)"""
+        for call in self.tool_calls:
+            content = results.get(call['id'], missing or f"Tool {call['function']['name']} is not available.")
+            self.history.append({"role": "tool", "tool_call_id": call['id'], "content": content})
+        self.tool_calls = []
+    
+    def _stream(self, tools: Optional[List[Dict]] = None) -> Generator[Tuple[str, str], None, None]:
+        """Stream one completion over the history, splitting reasoning from the answer and assembling tool calls"""
+        messages = self.history.messages()
+        tool_choice = "auto"
+        if not tools and self.tools and any(m["role"] == "tool" or m.get("tool_calls") for m in messages):
+            # Strict backends reject tool messages in a request that declares no tools
+            tools, tool_choice = self.tools, "none"
+        response = self.llm.chat(messages, stream=True, tools=tools, tool_choice=tool_choice)
         full_response = ""
         thinking = ""
         answer = ""
         in_think_tag = False
+        tool_calls = {}  # Stream index -> call being assembled from its deltas
+        self.tool_calls = []
         
         for chunk in response:
-            if chunk.choices[0].delta:
+            if chunk.choices and chunk.choices[0].delta:
                 delta = chunk.choices[0].delta
                 
+                # Tool calls arrive as fragments: id and name first, then the arguments JSON in pieces
+                for fragment in getattr(delta, 'tool_calls', None) or []:
+                    call = tool_calls.setdefault(fragment.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+                    if fragment.id:
+                        call["id"] = fragment.id
+                    if fragment.function and fragment.function.name:
+                        call["function"]["name"] += fragment.function.name
+                    if fragment.function and fragment.function.arguments:
+                        call["function"]["arguments"] += fragment.function.arguments
+                
                 # Handle OpenAI reasoning field (o1, o3 models)
                 if hasattr(delta, 'reasoning') and delta.reasoning:
                     thinking += delta.reasoning
@@ -134,58 +187,13 @@ class HealthAgent:
                     
                     yield (thinking, answer)
         
-        self.history.append({"role": "assistant", "content": full_response})
-    
-    def chat_with_vision(self, content: list) -> Generator[Tuple[str, str], None, None]:
-        """Chat with vision content (images/documents)"""
-        self.history.append({"role": "user", "content": content})
-        
-        response = self.llm.chat(self.history, stream=True)
-        full_response = ""
-        thinking = ""
-        answer = ""
-        in_think_tag = False
-        
-        for chunk in response:
-            if chunk.choices[0].delta:
-                delta = chunk.choices[0].delta
-                
-                if hasattr(delta, 'reasoning') and delta.reasoning:
-                    thinking += delta.reasoning
-                    yield (thinking, answer)
-                
-                if hasattr(delta, 'content') and delta.content:
-                    content_text = delta.content
-                    full_response += content_text
-                    
-                    if '<think>' in content_text:
-                        in_think_tag = True
-                        parts = content_text.split('<think>')
-                        if parts[0]:
-                            answer += parts[0]
-                        if len(parts) > 1:
-                            thinking += parts[1]
-                        yield (thinking, answer)
-                        continue
-                    
-                    if '</think>' in content_text:
-                        in_think_tag = False
-                        parts = content_text.split('</think>')
-                        if parts[0]:
-                            thinking += parts[0]
-                        if len(parts) > 1:
-                            answer += parts[1]
-                        yield (thinking, answer)
-                        continue
-                    
-                    if in_think_tag:
-                        thinking += content_text
-                    else:
-                        answer += content_text
-                    
-                    yield (thinking, answer)
-        
-        self.history.append({"role": "assistant", "content": full_response})
+        message = {"role": "assistant", "content": full_response}
+        if tool_calls:
+            self.tool_calls = [tool_calls[index] for index in sorted(tool_calls)]
+            message["tool_calls"] = self.tool_calls
+        self.history.append(message)
     
     def reset(self):
-        self.history = [{"role": "system", "content": SYSTEM_PROMPT}]
+        self.history.reset()
+        self.tool_calls = []
+        self.tools = None
@@ -18,9 +18,10 @@ class ConfigManager:
         self.config = self._load_config()
     
     def _load_config(self) -> ModelConfig:
+        self.data = {}
         if os.path.exists(self.config_path):
             with open(self.config_path, 'r') as f:
-                data = toml.load(f)
+                data = self.data = toml.load(f)
                 # Get provider from config or environment
                 provider = os.getenv('LLM_PROVIDER', data.get('provider', 'ollama'))
                 model_data = data.get('model', {}).get(provider, {})
@@ -41,6 +42,11 @@ class ConfigManager:
             'temperature': self.config.temperature,
             'max_tokens': self.config.max_tokens
         }
+    
+    def get_startup_budget(self) -> float:
+        """Seconds an entry point may take to import ([startup] budget_seconds, or PIXELCARE_STARTUP_BUDGET)"""
+        budget = os.getenv('PIXELCARE_STARTUP_BUDGET', self.data.get('startup', {}).get('budget_seconds', 3.0))
+        return float(budget)
 
 _config_manager = None
 
@@ -52,3 +58,6 @@ def get_config_manager() -> ConfigManager:
 
 def get_model_config() -> Dict[str, Any]:
     return get_config_manager().get_model_config()
+
+def get_startup_budget() -> float:
+    return get_config_manager().get_startup_budget()
@@ -1,8 +1,6 @@
 import base64
 from pathlib import Path
 from typing import List, Dict
-from PyPDF2 import PdfReader
-from PIL import Image
 import io
 
 class DocumentProcessor:
@@ -25,6 +23,7 @@ class DocumentProcessor:
         # Try pdf2image first (best quality)
         try:
             from pdf2image import convert_from_path
+            from PIL import Image
             images = convert_from_path(pdf_path, dpi=200)
             
             content = []
@@ -51,6 +50,7 @@ class DocumentProcessor:
             # Fallback: extract text only
             print(f"PDF image conversion failed ({e}), using text extraction")
             try:
+                from PyPDF2 import PdfReader
                 reader = PdfReader(pdf_path)
                 text_parts = []
                 
@@ -78,6 +78,7 @@ class DocumentProcessor:
         """Encode image to base64 with optimization"""
         try:
             # Open and optimize image
+            from PIL import Image
             img = Image.open(image_path)
             
             # Convert to RGB if needed
@@ -0,0 +1,141 @@
+"""Bounded conversation history for the HealthAgent.
+
+Every request resends the history, so it is kept under a token budget:
+  - Document images go to the model once. After that turn they become short
+    text references, and the assistant's reply about them stays in history.
+    An image that was already sent is replaced by a reference when it is
+    attached again.
+  - Extracted document text (PDFs without page images) is clipped the same way
+    once its turn is over.
+  - When the history exceeds its budget, the oldest turns are folded into a
+    running summary (a system message). The newest keep_turns turns are
+    always kept verbatim.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List
+
+CHARS_PER_TOKEN = 4  # Rough estimate for English text
+IMAGE_TOKENS = 1000  # Rough cost of one high-detail image part
+
+def estimate_tokens(message: Dict[str, Any]) -> int:
+    """Approximate token count of one chat message (images at a flat IMAGE_TOKENS)"""
+    content = message.get("content")
+    tokens = 4  # Role and message framing
+    if isinstance(content, list):
+        for part in content:
+            if part.get("type") == "image_url":
+                tokens += IMAGE_TOKENS
+            else:
+                tokens += len(part.get("text", "")) // CHARS_PER_TOKEN
+    elif content:
+        tokens += len(content) // CHARS_PER_TOKEN
+    if message.get("tool_calls"):
+        tokens += len(json.dumps(message["tool_calls"])) // CHARS_PER_TOKEN
+    return tokens
+
+def _text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+    return content or ""
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+class ConversationHistory:
+    """System prompt + running summary + recent turns, within max_tokens"""
+    def __init__(self, system_prompt: str, max_tokens: int = 6000, keep_turns: int = 2,
+                 summary_chars: int = 2000, excerpt_chars: int = 300, document_chars: int = 4000):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens  # Budget for everything except the turn in progress
+        self.keep_turns = keep_turns  # Most recent turns never compacted
+        self.summary_chars = summary_chars  # Cap on the running summary (oldest lines drop first)
+        self.excerpt_chars = excerpt_chars  # Per-message excerpt kept in the summary
+        self.document_chars = document_chars  # Document text kept per part after its turn
+        self.reset()
+
+    def reset(self):
+        self.summary: List[str] = []
+        self.turns: List[List[Dict[str, Any]]] = []  # Each turn: a user message and everything after it
+        self._images: Dict[str, int] = {}  # Image hash -> reference number
+
+    def add_user(self, content):
+        """Start a new turn; earlier turns are shrunk and compacted first"""
+        for turn in self.turns:
+            for message in turn:
+                self._shrink(message)
+        self.turns.append([{"role": "user", "content": self._dedupe_images(content)}])
+        self._compact()
+
+    def append(self, message: Dict[str, Any]):
+        """Add an assistant or tool message to the current turn"""
+        if not self.turns:
+            self.turns.append([])
+        self.turns[-1].append(message)
+
+    def messages(self) -> List[Dict[str, Any]]:
+        """The message list to send to the model"""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + "\n".join(self.summary)})
+        for turn in self.turns:
+            messages.extend(turn)
+        return messages
+
+    def tokens(self) -> int:
+        return sum(estimate_tokens(message) for message in self.messages())
+
+    def _dedupe_images(self, content):
+        """Replace images that were already sent in an earlier turn with a reference"""
+        if not isinstance(content, list):
+            return content
+        parts = []
+        for part in content:
+            if part.get("type") == "image_url":
+                number = self._images.get(self._hash(part))
+                if number is not None:
+                    part = {"type": "text", "text": f"[Document image #{number}: already shared and analyzed earlier in this conversation]"}
+            parts.append(part)
+        return parts
+
+    def _shrink(self, message: Dict[str, Any]):
+        """Swap image parts of a finished turn for text references and clip long document text"""
+        content = message.get("content")
+        if not isinstance(content, list):
+            return
+        parts = []
+        for part in content:
+            if part.get("type") == "image_url":
+                key = self._hash(part)
+                number = self._images.setdefault(key, len(self._images) + 1)
+                part = {"type": "text", "text": f"[Document image #{number}: shared earlier; see the analysis that followed]"}
+            elif part.get("type") == "text" and len(part.get("text", "")) > self.document_chars:
+                part = {"type": "text", "text": part["text"][:self.document_chars] + " [... truncated]"}
+            parts.append(part)
+        message["content"] = parts
+
+    @staticmethod
+    def _hash(part: Dict[str, Any]) -> str:
+        return hashlib.sha1(part["image_url"]["url"].encode()).hexdigest()
+
+    def _compact(self):
+        """Fold the oldest turns into the summary until the history before the current turn fits the budget"""
+        def over_budget():
+            finished = sum(estimate_tokens(m) for turn in self.turns[:-1] for m in turn)
+            summary = (sum(len(line) for line in self.summary) + len(self.system_prompt)) // CHARS_PER_TOKEN
+            return finished + summary > self.max_tokens
+
+        while len(self.turns) > self.keep_turns + 1 and over_budget():
+            turn = self.turns.pop(0)
+            for message in turn:
+                if message["role"] == "user":
+                    self.summary.append("User: " + _clip(_text(message), self.excerpt_chars))
+                elif message["role"] == "assistant" and _text(message):
+                    self.summary.append("Assistant: " + _clip(_text(message), self.excerpt_chars))
+                elif message["role"] == "assistant":
+                    names = [call["function"]["name"] for call in message.get("tool_calls", [])]
+                    self.summary.append(f"Assistant called: {', '.join(names)}")
+        while self.summary and sum(len(line) for line in self.summary) > self.summary_chars:
+            self.summary.pop(0)
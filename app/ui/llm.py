@@ -1,5 +1,4 @@
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 try:
     from .config import get_model_config
 except ImportError:
@@ -10,18 +9,25 @@ class LLMClient:
     def __init__(self, model: Optional[str] = None):
         config = get_model_config()
         self.model = model or config['name']
-        self.client = OpenAI(
-            base_url=config['url'],
-            api_key=config['api_key']
-        )
+        self.base_url = config['url']
+        self.api_key = config['api_key']
+        self._client = None
         self.temperature = config['temperature']
     
+    @property
+    def client(self):
+        """OpenAI client, created (and openai imported) on first use"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+        return self._client
+    
     def encode_image(self, image_path: str) -> str:
         """Encode image to base64"""
         with open(image_path, "rb") as f:
             return base64.b64encode(f.read()).decode('utf-8')
     
-    def chat(self, messages: List[Dict], stream: bool = True, tools: Optional[List[Dict]] = None) -> Any:
+    def chat(self, messages: List[Dict], stream: bool = True, tools: Optional[List[Dict]] = None, tool_choice: str = "auto") -> Any:
         params = {
             "model": self.model,
             "messages": messages,
@@ -31,6 +37,6 @@ class LLMClient:
         
         if tools:
             params["tools"] = tools
-            params["tool_choice"] = "auto"
+            params["tool_choice"] = tool_choice
         
         return self.client.chat.completions.create(**params)
@@ -3,25 +3,40 @@
 import gradio as gr
 import sys
 import json
-import time
-import cv2
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from vitals.live_collector import LiveVitalsCollector
 from ui.agent import HealthAgent
-from ui.llm import LLMClient
-from ui.document_processor import DocumentProcessor
 from ui.document_processor import DocumentProcessor
 
-agent = HealthAgent()
-llm_client = LLMClient()
-doc_processor = DocumentProcessor()
+# Clients are built on first use so importing this module stays cheap
+_agent = None
+_doc_processor = None
 latest_vitals = None
 uploaded_docs = []
 
+# Every vitals session borrows a warm collector (the pool is warmed at launch, see __main__)
+VITALS_OPTIONS = {'duration': 10, 'headless': True}
+
+def get_agent():
+    global _agent
+    if _agent is None:
+        _agent = HealthAgent()
+    return _agent
+
+def get_doc_processor():
+    global _doc_processor
+    if _doc_processor is None:
+        _doc_processor = DocumentProcessor()
+    return _doc_processor
+
+def get_collector_pool():
+    """The vitals pool; importing it loads cv2, MediaPipe and SciPy"""
+    from vitals.pool import collector_pool
+    return collector_pool
+
 # Tool definition for vitals collection
 VITALS_TOOL = {
     "type": "function",
@@ -136,38 +151,21 @@ def format_vitals_summary(vitals):
 """
     return html
 
-def collect_vitals_with_progress():
-    """Collect vitals with progress UI"""
-    global latest_vitals
-    
-    import threading
-    
-    result_holder = {'vitals': None}
-    
-    def collect():
-        collector = LiveVitalsCollector(duration=10, headless=True)
-        result_holder['vitals'] = collector.collect()
-    
-    collection_thread = threading.Thread(target=collect)
-    collection_thread.start()
-    
-    # Progress display
-    vitals_steps = [
-        "❤️ Heart Rate", "🫁 Breathing Rate", "👁️ Blink Detection",
-        "👀 Gaze Tracking", "🧭 Head Pose", "🧍 Posture Analysis",
-        "🤸 Movement Detection", "😊 Emotion Recognition",
-        "💓 HRV Analysis", "📊 Final Metrics"
+def format_collection_progress(event):
+    """Progress card for one 'capturing' event from the collector"""
+    duration = event['duration']
+    progress = min(int(event['elapsed'] / duration * 100), 100)
+    remaining = max(int(duration - event['elapsed']), 0)
+    hr = event['heart_rate']
+    br = event['breathing_rate']
+    readings = [
+        ("❤️ Heart Rate", f"{hr:.0f} BPM" if hr else "measuring..."),
+        ("🫁 Breathing Rate", f"{br:.0f} BPM" if br else "measuring..."),
+        ("🙂 Face", "detected" if event['face_detected'] else "not in frame - look at the camera"),
+        ("🎞️ Frames", str(event['frames'])),
     ]
     
-    start_time = time.time()
-    
-    while time.time() - start_time < 10:
-        elapsed = time.time() - start_time
-        remaining = 10 - int(elapsed)
-        progress = int((elapsed / 10) * 100)
-        step_index = min(int((elapsed / 10) * len(vitals_steps)), len(vitals_steps) - 1)
-        
-        progress_html = f"""
+    html = f"""
 <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 12px; color: white;">
     <h3 style="margin: 0 0 15px 0;">📹 Collecting Vitals from Camera</h3>
     <div style="background: rgba(255,255,255,0.2); border-radius: 8px; padding: 3px; margin-bottom: 15px;">
@@ -180,45 +178,68 @@ def collect_vitals_with_progress():
 </div>
 
 <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; margin-top: 15px;">
-    <h4 style="margin: 0 0 12px 0; color: #333;">🔬 Vitals Being Collected:</h4>
+    <h4 style="margin: 0 0 12px 0; color: #333;">🔬 Live Readings:</h4>
     <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 8px;">
 """
-        for i, vital in enumerate(vitals_steps):
-            if i < step_index:
-                status = "✅"
-                opacity = "1"
-            elif i == step_index:
-                status = "⏳"
-                opacity = "1"
-            else:
-                status = "⏸️"
-                opacity = "0.4"
-            
-            progress_html += f'<div style="opacity: {opacity}; padding: 8px; background: white; border-radius: 6px;">{status} {vital}</div>'
-        
-        progress_html += "</div></div>"
-        yield progress_html
-        time.sleep(0.5)
-    
-    collection_thread.join()
-    latest_vitals = result_holder['vitals']
+    for label, value in readings:
+        html += f'<div style="padding: 8px; background: white; border-radius: 6px;">{label}: <b>{value}</b></div>'
     
-    # Analysis progress
-    for i in range(6):
-        progress = int(((i + 1) / 6) * 100)
-        yield f"""
+    html += "</div></div>"
+    return html
+
+ANALYZING_HTML = """
 <div style="background: linear-gradient(135deg, #17a2b8 0%, #138496 100%); padding: 20px; border-radius: 12px; color: white;">
-    <h3 style="margin: 0 0 15px 0;">🔬 Analyzing Vitals Data</h3>
-    <div style="background: rgba(255,255,255,0.2); border-radius: 8px; padding: 3px;">
-        <div style="background: #ffc107; height: 25px; border-radius: 6px; width: {progress}%;">
-            <div style="text-align: center; line-height: 25px; font-weight: bold; color: #333;">{progress}%</div>
-        </div>
-    </div>
+    <h3 style="margin: 0;">🔬 Analyzing Vitals Data...</h3>
 </div>
 """
-        time.sleep(0.3)
+
+def collect_vitals_with_progress():
+    """Collect vitals, rendering the collector's own progress events; the last yield is the summary"""
+    global latest_vitals
+    
+    import queue
+    import threading
+    
+    class ProgressQueue(queue.Queue):
+        """Remembers whether 'done' was published, so a failure after it can't end the stream twice"""
+        done = False
+        
+        def put(self, event, *args, **kwargs):
+            self.done = self.done or event['stage'] == 'done'
+            super().put(event, *args, **kwargs)
+    
+    events = ProgressQueue()
+    
+    def collect():
+        try:
+            with get_collector_pool().borrow(**VITALS_OPTIONS) as collector:
+                collector.collect(progress=events)
+        except Exception as e:
+            print(f"❌ Vitals collection failed: {e}")
+            if not events.done:
+                events.put({'stage': 'done', 'results': None})
     
-    return format_vitals_summary(latest_vitals)
+    yield """
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 12px; color: white;">
+    <h3 style="margin: 0;">📹 Starting camera...</h3>
+</div>
+"""
+    threading.Thread(target=collect, daemon=True).start()
+    
+    while True:
+        event = events.get()
+        if event['stage'] == 'capturing':
+            # Only render the newest event if several queued up while the UI was busy
+            while not events.empty() and event['stage'] == 'capturing':
+                event = events.get()
+        if event['stage'] == 'capturing':
+            yield format_collection_progress(event)
+        elif event['stage'] == 'analyzing':
+            yield ANALYZING_HTML
+        elif event['stage'] == 'done':
+            latest_vitals = event['results']
+            yield format_vitals_summary(latest_vitals)
+            return
 
 def handle_file_upload(files):
     """Handle uploaded documents"""
@@ -233,7 +254,7 @@ def handle_file_upload(files):
     
     for file in file_list:
         try:
-            content = doc_processor.process_file(file.name)
+            content = get_doc_processor().process_file(file.name)
             uploaded_docs.append({
                 'name': Path(file.name).name,
                 'content': content
@@ -258,7 +279,7 @@ def chat_with_agentic_vitals(message, history):
         thinking_text = ""
         answer_text = ""
         
-        for thinking, answer in agent.chat_with_vision(content):
+        for thinking, answer in get_agent().chat_with_vision(content):
             thinking_text = thinking
             answer_text = answer
             
@@ -279,94 +300,17 @@ def chat_with_agentic_vitals(message, history):
             yield full_response
         return
     
-    # Build message for tool checking
-    messages = [{"role": "user", "content": message}]
-    
-    response = llm_client.chat(messages, stream=False, tools=[VITALS_TOOL])
-    
-    # Check if tool was called
-    if hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
-        tool_call = response.choices[0].message.tool_calls[0]
-        
-        if tool_call.function.name == "collect_vitals":
-            # AI decided to collect vitals
-            args = json.loads(tool_call.function.arguments)
-            reason = args.get('reason', 'To answer your question')
-            
-            yield f"🤖 **{reason}**\n\nStarting vitals collection..."
-            time.sleep(1)
-            
-            # Run collection with progress
-            for progress in collect_vitals_with_progress():
-                yield progress
-            
-            # Now get AI analysis with vitals
-            mood_prompt = get_mood_prompt(latest_vitals)
-            vitals_json = json.dumps(latest_vitals.get('session_summary', {}), indent=2)
-            
-            analysis_prompt = f"""{mood_prompt}
-
-User asked: {message}
-
-Here are their vitals:
-{vitals_json}
-
-Provide a personalized response to their question using the vitals data."""
-            
-            # LLM processing progress
-            for i in range(5):
-                progress = int(((i + 1) / 5) * 100)
-                yield format_vitals_summary(latest_vitals) + f"""
-<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 12px; color: white;">
-    <h3 style="margin: 0 0 15px 0;">🤖 AI Processing</h3>
-    <div style="background: rgba(255,255,255,0.2); border-radius: 8px; padding: 3px;">
-        <div style="background: #e74c3c; height: 25px; border-radius: 6px; width: {progress}%;">
-            <div style="text-align: center; line-height: 25px; font-weight: bold;">{progress}%</div>
-        </div>
-    </div>
-</div>
-"""
-                time.sleep(0.4)
-            
-            # Stream AI response
-            thinking_text = ""
-            answer_text = ""
-            
-            for thinking, answer in agent.chat(analysis_prompt):
-                thinking_text = thinking
-                answer_text = answer
-                
-                if thinking_text:
-                    full_response = format_vitals_summary(latest_vitals) + f"""
-<details style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #764ba2;">
-    <summary style="color: #fff; font-weight: bold; cursor: pointer;">🤔 AI Thinking (click to expand)</summary>
-    <div style="color: #f0f0f0; font-family: monospace; white-space: pre-wrap; margin-top: 10px; padding-top: 10px; border-top: 1px solid rgba(255,255,255,0.3);">{thinking_text}</div>
-</details>
-<div style="background: #f8f9fa; padding: 15px; border-radius: 10px; border-left: 4px solid #667eea;">
-    <div style="color: #667eea; font-weight: bold; margin-bottom: 10px;">🤖 AI Health Analysis</div>
-    <div style="color: #333; line-height: 1.6;">{answer_text}</div>
-</div>
-"""
-                else:
-                    full_response = format_vitals_summary(latest_vitals) + f"""
-<div style="background: #f8f9fa; padding: 15px; border-radius: 10px; border-left: 4px solid #667eea;">
-    <div style="color: #667eea; font-weight: bold; margin-bottom: 10px;">🤖 AI Health Analysis</div>
-    <div style="color: #333; line-height: 1.6;">{answer_text}</div>
-</div>
-"""
-                
-                yield full_response
-            return
-    
-    # Regular chat without vitals
+    # One streamed call with the vitals tool enabled: text goes straight to the user,
+    # and a collect_vitals call is assembled from the same stream
     if latest_vitals and any(word in message.lower() for word in ['vitals', 'health', 'heart', 'breathing']):
         vitals_summary = json.dumps(latest_vitals.get('session_summary', {}), indent=2)
         message = f"{message}\n\nMy vitals:\n{vitals_summary}"
     
+    agent = get_agent()
     thinking_text = ""
     answer_text = ""
     
-    for thinking, answer in agent.chat(message):
+    for thinking, answer in agent.chat(message, tools=[VITALS_TOOL]):
         thinking_text = thinking
         answer_text = answer
         
@@ -385,6 +329,68 @@ Provide a personalized response to their question using the vitals data."""
             full_response = answer_text
         
         yield full_response
+    
+    # Check if tool was called
+    tool_call = next((call for call in agent.tool_calls if call['function']['name'] == "collect_vitals"), None)
+    if tool_call is None:
+        if agent.tool_calls:
+            # Unknown tool: answer it so the history stays valid, then let the model reply without it
+            for thinking, answer in agent.tool_results({}):
+                yield answer
+        return
+    
+    # AI decided to collect vitals
+    try:
+        args = json.loads(tool_call['function']['arguments'] or '{}')
+    except json.JSONDecodeError:
+        args = {}
+    reason = args.get('reason', 'To answer your question')
+    
+    yield f"🤖 **{reason}**\n\nStarting vitals collection..."
+    
+    # Run collection with progress (ends with the vitals summary as soon as results exist)
+    for progress in collect_vitals_with_progress():
+        yield progress
+    
+    # Now get AI analysis with vitals, as the tool's result
+    mood_prompt = get_mood_prompt(latest_vitals)
+    vitals_json = json.dumps((latest_vitals or {}).get('session_summary', {}), indent=2)
+    
+    tool_result = f"""{mood_prompt}
+
+Here are their vitals:
+{vitals_json}
+
+Provide a personalized response to their question using the vitals data."""
+    
+    # Stream AI response
+    thinking_text = ""
+    answer_text = ""
+    
+    for thinking, answer in agent.tool_results({tool_call['id']: tool_result}):
+        thinking_text = thinking
+        answer_text = answer
+        
+        if thinking_text:
+            full_response = format_vitals_summary(latest_vitals) + f"""
+<details style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #764ba2;">
+    <summary style="color: #fff; font-weight: bold; cursor: pointer;">🤔 AI Thinking (click to expand)</summary>
+    <div style="color: #f0f0f0; font-family: monospace; white-space: pre-wrap; margin-top: 10px; padding-top: 10px; border-top: 1px solid rgba(255,255,255,0.3);">{thinking_text}</div>
+</details>
+<div style="background: #f8f9fa; padding: 15px; border-radius: 10px; border-left: 4px solid #667eea;">
+    <div style="color: #667eea; font-weight: bold; margin-bottom: 10px;">🤖 AI Health Analysis</div>
+    <div style="color: #333; line-height: 1.6;">{answer_text}</div>
+</div>
+"""
+        else:
+            full_response = format_vitals_summary(latest_vitals) + f"""
+<div style="background: #f8f9fa; padding: 15px; border-radius: 10px; border-left: 4px solid #667eea;">
+    <div style="color: #667eea; font-weight: bold; margin-bottom: 10px;">🤖 AI Health Analysis</div>
+    <div style="color: #333; line-height: 1.6;">{answer_text}</div>
+</div>
+"""
+        
+        yield full_response
 
 with gr.Blocks(title="PixelCare AI") as demo:
     gr.Markdown("# 🏥 PixelCare - AI Health Companion")
@@ -462,4 +468,6 @@ if __name__ == "__main__":
     print("🧠 Agentic vitals collection enabled")
     print("=" * 50)
     
+    # Load the vitals models in the background while the UI comes up
+    get_collector_pool().warm_async(**VITALS_OPTIONS)
     demo.launch(server_name="0.0.0.0", server_port=7860, debug=True)
@@ -8,14 +8,21 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from agent import HealthAgent
 
-agent = HealthAgent()
+_agent = None
+
+def get_agent():
+    """HealthAgent built on first use (keeps cold start short)"""
+    global _agent
+    if _agent is None:
+        _agent = HealthAgent()
+    return _agent
 
 def chat_response(message, history):
     """Simple chat without vitals collection"""
     thinking_text = ""
     answer_text = ""
     
-    for thinking, answer in agent.chat(message):
+    for thinking, answer in get_agent().chat(message):
         thinking_text = thinking
         answer_text = answer
         
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Cold-start check for the UI entry points.
+
+Each entry is imported in a fresh interpreter, as a replica would start it (the
+Gradio Blocks are built, nothing is launched):
+
+    python app/ui/startup.py                       # fail if an entry exceeds the budget
+    python app/ui/startup.py --profile             # plus a per-module import breakdown
+    python app/ui/startup.py --budget 2 app.py     # explicit budget / entries
+
+The budget comes from [startup] budget_seconds in config.toml (or
+PIXELCARE_STARTUP_BUDGET).
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+try:
+    from .config import get_startup_budget
+except ImportError:
+    from config import get_startup_budget
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+ENTRY_POINTS = ['app.py', 'app/ui/main.py', 'app/ui/main_cloud.py']
+
+# Runs the entry like `python <entry>` would, minus the __main__ block
+_RUNNER = """
+import runpy, sys, time
+path = sys.argv[1]
+sys.path.insert(0, sys.argv[2])
+start = time.perf_counter()
+runpy.run_path(path, run_name='startup_check')
+print(f"STARTUP {time.perf_counter() - start:.6f}")
+"""
+
+def parse_importtime(stderr):
+    """{top-level package: cumulative seconds} from `python -X importtime` output"""
+    modules = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        if name.startswith('  '):  # Nested import: already counted in its parent's cumulative time
+            continue
+        modules[name.strip().split('.')[0]] += int(cumulative) / 1e6
+    return dict(modules)
+
+def measure(entry, profile=False):
+    """(seconds to import `entry`, per-package breakdown or None)"""
+    path = (ROOT / entry).resolve()
+    command = [sys.executable] + (['-X', 'importtime'] if profile else []) + ['-c', _RUNNER, str(path), str(path.parent)]
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=path.parent)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('STARTUP ')]
+    if proc.returncode != 0 or not lines:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f"{entry} failed to import:\n" + '\n'.join(errors[-10:]))
+    seconds = float(lines[-1].split()[1])
+    return seconds, parse_importtime(proc.stderr) if profile else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure UI entry point startup against a budget")
+    parser.add_argument('entries', nargs='*', default=ENTRY_POINTS, help="Entry scripts, relative to the repo root")
+    parser.add_argument('--budget', type=float, default=None, help="Seconds allowed per entry (default: config)")
+    parser.add_argument('--profile', action='store_true', help="Print the slowest imports of each entry")
+    parser.add_argument('--top', type=int, default=15, help="Modules shown with --profile")
+    args = parser.parse_args(argv)
+    budget = args.budget if args.budget is not None else get_startup_budget()
+
+    failed = []
+    for entry in args.entries:
+        try:
+            seconds, modules = measure(entry, args.profile)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            failed.append(entry)
+            continue
+        ok = seconds <= budget
+        print(f"{'✅' if ok else '❌'} {entry}: {seconds:.2f}s (budget {budget:.2f}s)")
+        if not ok:
+            failed.append(entry)
+        if modules:
+            for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"   {cumulative:7.3f}s  {name}")
+
+    if failed:
+        print(f"⚠️ Over budget or failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+"""Synthetic-subject benchmark for the vitals pipeline.
+
+Renders a drawn subject with a known pulse (skin-tone modulation), breathing
+(shoulder motion) and blink schedule, then measures per-stage throughput,
+peak memory and error against that ground truth. Runs fully headless:
+
+    python -m app.vitals.benchmark --seconds 20 --json bench.json
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import cv2
+from .frame_context import LandmarkExtractor
+from .heart_rate_chrom import CHROMHeartRate
+from .streaming_hr import StreamingCHROM
+from .breathing_rate import BreathingDetector
+from .blink_detector import BlinkDetector
+from .hrv_analyzer import HRVAnalyzer
+from .emotion import EmotionDetector
+from .gaze_tracker import GazeTracker
+from .head_pose_estimator import HeadPoseEstimator
+from .posture_analyzer import PostureAnalyzer
+from .movement_detector import MovementDetector
+from .facial_action_units import FacialActionUnits
+from .live_collector import LiveVitalsCollector
+
+SKIN = (140, 170, 215)  # BGR
+# Relative pulse amplitude per BGR channel (blood absorbs green most)
+PULSE_WEIGHTS = np.array([0.4, 1.0, 0.55], dtype=np.float32)
+
+class SyntheticSubject:
+    """Procedurally drawn person whose vital signs are known exactly"""
+    def __init__(self, width=640, height=480, fps=30, heart_bpm=72, breath_bpm=15, blink_interval=3.0,
+                 blink_duration=0.2, pulse_amplitude=0.01, breath_pixels=6, noise=1.5, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.heart_bpm = heart_bpm
+        self.breath_bpm = breath_bpm
+        self.blink_interval = blink_interval  # Seconds between blink onsets
+        self.blink_duration = blink_duration
+        self.pulse_amplitude = pulse_amplitude  # Fractional skin brightness change
+        self.breath_pixels = breath_pixels  # Peak shoulder displacement
+        self.noise = noise  # Sensor noise (std, grey levels); also dithers the pulse below 1 level
+        self.rng = np.random.default_rng(seed)
+
+    def blink_onsets(self, seconds):
+        return np.arange(self.blink_interval / 2, seconds - self.blink_duration, self.blink_interval)
+
+    def truth(self, seconds):
+        blinks = len(self.blink_onsets(seconds))
+        return {
+            'heart_rate': self.heart_bpm,
+            'breathing_rate': self.breath_bpm,
+            'blink_count': blinks,
+            'blink_rate': round(blinks / seconds * 60, 1),
+            'blink_duration_ms': round(self.blink_duration * 1000, 1),
+        }
+
+    def eyes_closed(self, t):
+        phase = (t - self.blink_interval / 2) % self.blink_interval
+        return t >= self.blink_interval / 2 and phase < self.blink_duration
+
+    def render(self, t):
+        """BGR frame of the subject at time t (seconds); geometry scales with the resolution"""
+        h, w = self.height, self.width
+        k = min(w / 640, h / 480)
+        def px(v):
+            return int(round(v * k))
+        img = np.full((h, w, 3), (200, 210, 215), np.uint8)
+        cx, cy = w // 2, int(h * 0.4)
+
+        # Torso rises and falls with breathing (drawn at 1/16 px precision)
+        lift = self.breath_pixels * k * np.sin(2 * np.pi * self.breath_bpm / 60 * t)
+        torso_y = int(round((h + px(40) - lift) * 16))
+        cv2.ellipse(img, (cx * 16, torso_y), (px(205) * 16, px(168) * 16), 0, 180, 360, (90, 60, 40), -1, cv2.LINE_AA, 4)
+        cv2.rectangle(img, (cx - px(35), cy + px(80)), (cx + px(35), cy + px(150)), SKIN, -1)
+
+        # Head
+        cv2.ellipse(img, (cx, cy - px(20)), (px(105), px(125)), 0, 0, 360, (30, 40, 60), -1)
+        cv2.ellipse(img, (cx, cy), (px(90), px(120)), 0, 0, 360, SKIN, -1)
+        closed = self.eyes_closed(t)
+        ey = cy - px(20)
+        for side in (-1, 1):
+            ex = cx + side * px(38)
+            if closed:
+                cv2.line(img, (ex - px(22), ey), (ex + px(22), ey), (80, 90, 110), max(2, px(2)))
+            else:
+                cv2.ellipse(img, (ex, ey), (px(22), px(10)), 0, 0, 360, (245, 245, 245), -1)
+                cv2.circle(img, (ex, ey), px(8), (60, 40, 30), -1)
+                cv2.circle(img, (ex, ey), px(3), (10, 10, 10), -1)
+                cv2.ellipse(img, (ex, ey), (px(22), px(10)), 0, 0, 360, (80, 90, 110), max(1, px(1)))
+            cv2.line(img, (ex - px(22), cy - px(45)), (ex + px(22), cy - px(48)), (40, 50, 70), px(5))
+        cv2.line(img, (cx, cy - px(10)), (cx - px(8), cy + px(30)), (110, 140, 190), px(3))
+        cv2.ellipse(img, (cx, cy + px(32)), (px(14), px(6)), 0, 0, 360, (110, 140, 190), -1)
+        cv2.ellipse(img, (cx, cy + px(62)), (px(30), px(9)), 0, 0, 360, (90, 90, 180), -1)
+        cv2.line(img, (cx - px(30), cy + px(62)), (cx + px(30), cy + px(62)), (60, 60, 120), px(2))
+
+        # Pulse: modulate skin pixels only, then add sensor noise
+        skin = np.all(img == SKIN, axis=2)
+        out = img.astype(np.float32)
+        pulse = self.pulse_amplitude * np.sin(2 * np.pi * self.heart_bpm / 60 * t)
+        out[skin] *= 1 + pulse * PULSE_WEIGHTS
+        out += self.noise * self.rng.standard_normal(out.shape, dtype=np.float32)
+        return np.clip(out, 0, 255).astype(np.uint8)
+
+    def frames(self, seconds):
+        """Yield (frame, timestamp) pairs at the subject's fps"""
+        for i in range(int(seconds * self.fps)):
+            t = i / self.fps
+            yield self.render(t), t
+
+    def write_video(self, path, seconds):
+        """Encode the subject to a video file (MJPG keeps the pulse above compression noise)"""
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), self.fps, (self.width, self.height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Cannot open video writer for {path}")
+        for frame, _ in self.frames(seconds):
+            writer.write(frame)
+        writer.release()
+        return path
+
+def _peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def _stage_stats(times):
+    times = np.asarray(times)
+    if not len(times):
+        return {'frames': 0}
+    mean = times.mean()
+    return {
+        'frames': len(times),
+        'mean_ms': round(mean * 1000, 3),
+        'p95_ms': round(np.percentile(times, 95) * 1000, 3),
+        'fps': round(1.0 / mean, 1) if mean > 0 else None,
+    }
+
+def _final(summary):
+    # Summaries use 'final_value' when samples exist and 'value' otherwise
+    return summary.get('final_value', summary.get('value'))
+
+def _error(estimate, truth):
+    return round(abs(estimate - truth), 1) if estimate is not None else None
+
+def benchmark_stages(subject, seconds=20, memory_frames=30, crop=False):
+    """Time every detector stage on the synthetic frames and score its output"""
+    fps = subject.fps
+    capacity = int(seconds * fps)
+    landmarks = LandmarkExtractor(crop=crop)
+    hr = CHROMHeartRate(fps, trace_capacity=capacity)
+    live_hr = StreamingCHROM(fps)
+    br = BreathingDetector(fps, trace_capacity=capacity)
+    blink = BlinkDetector(trace_capacity=capacity, fps=fps)
+    gaze, head_pose, posture = GazeTracker(), HeadPoseEstimator(), PostureAnalyzer()
+    movement = MovementDetector()
+    emotion, facial_au = EmotionDetector(), FacialActionUnits()
+
+    state = {}
+    stages = {
+        'chrom_update': lambda c: state.update(rgb=hr.update(c)),
+        'streaming_hr': lambda c: live_hr.update(state['rgb'], c.timestamp),
+        'breathing': br.update,
+        'blink': blink.detect,
+        'gaze': gaze.detect,
+        'head_pose': head_pose.estimate,
+        'posture': posture.analyze,
+        'movement': movement.detect,
+        'emotion': emotion.detect,
+        'facial_au': facial_au.detect,
+    }
+    times = {'render': [], 'landmarks': []}
+    times.update({name: [] for name in stages})
+    kept = []  # First contexts, replayed under tracemalloc for per-stage memory
+    faces = poses = 0
+    last_blink = None
+
+    try:
+        for i in range(capacity):
+            t0 = time.perf_counter()
+            frame = subject.render(i / fps)
+            t1 = time.perf_counter()
+            context = landmarks.process(frame, i / fps)
+            t2 = time.perf_counter()
+            times['render'].append(t1 - t0)
+            times['landmarks'].append(t2 - t1)
+            faces += context.face_landmarks is not None
+            poses += context.pose_landmarks is not None
+            for name, stage in stages.items():
+                start = time.perf_counter()
+                result = stage(context)
+                times[name].append(time.perf_counter() - start)
+                if name == 'blink' and result:
+                    last_blink = result
+            if len(kept) < memory_frames:
+                kept.append(context)
+    finally:
+        landmarks.close()
+
+    # Whole-session estimates, as computed when a collection finishes
+    finalize = {}
+    start = time.perf_counter()
+    hr_batch = hr.estimate()
+    finalize['chrom_estimate'] = time.perf_counter() - start
+    start = time.perf_counter()
+    br_final = br.estimate()
+    finalize['breathing_estimate'] = time.perf_counter() - start
+    green = hr.trace.resampled(fps)[:, 1]
+    green = green[~np.isnan(green)]
+    start = time.perf_counter()
+    hrv = HRVAnalyzer(fps).calculate_hrv(green)
+    finalize['hrv'] = time.perf_counter() - start
+    start = time.perf_counter()
+    blinks = blink.analyze()
+    finalize['blink_analysis'] = time.perf_counter() - start
+
+    memory = _stage_memory(stages, kept, fps)
+    truth = subject.truth(seconds)
+    return {
+        'frames': capacity,
+        'detection': {'face': round(faces / capacity, 3), 'pose': round(poses / capacity, 3)},
+        'stages': {name: dict(_stage_stats(t), peak_kb=memory.get(name)) for name, t in times.items()},
+        'finalize_ms': {name: round(t * 1000, 3) for name, t in finalize.items()},
+        'estimates': {
+            'heart_rate_batch': hr_batch,
+            'heart_rate_streaming': live_hr.current_bpm(),
+            'breathing_rate': br_final,
+            'blink_count': blinks['count'] if blinks else None,
+            'blink_count_incremental': last_blink['blink_count'] if last_blink else None,
+            'blink_duration_ms': blinks['mean_duration_ms'] if blinks else None,
+            'hrv': hrv,
+        },
+        'errors': {
+            'heart_rate_batch': _error(hr_batch, truth['heart_rate']),
+            'heart_rate_streaming': _error(live_hr.current_bpm(), truth['heart_rate']),
+            'breathing_rate': _error(br_final, truth['breathing_rate']),
+            'blink_count': _error(blinks['count'], truth['blink_count']) if blinks else None,
+            'blink_count_incremental': _error(last_blink['blink_count'], truth['blink_count']) if last_blink else None,
+            'blink_duration_ms': _error(blinks['mean_duration_ms'], truth['blink_duration_ms']) if blinks else None,
+        },
+        'truth': truth,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def _stage_memory(stages, contexts, fps):
+    """Peak traced (Python + NumPy) allocation per stage call, in KB"""
+    if not contexts:
+        return {}
+    peaks = {name: 0 for name in stages}
+    tracemalloc.start()
+    try:
+        for context in contexts:
+            for name, stage in stages.items():
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                stage(context)
+                peaks[name] = max(peaks[name], tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return {name: round(peak / 1024, 1) for name, peak in peaks.items()}
+
+def benchmark_pipeline(subject, seconds=20, execution='inline', video_path=None, crop=False):
+    """Encode the subject to a file and run the full headless LiveVitalsCollector over it"""
+    cleanup = video_path is None
+    if video_path is None:
+        handle, video_path = tempfile.mkstemp(suffix='.avi')
+        os.close(handle)
+    try:
+        subject.write_video(video_path, seconds)
+        fps = subject.fps
+        collector = LiveVitalsCollector(duration=seconds, fps=fps, sample_interval=fps,
+                                        vital_sample_interval=2 * fps, headless=True, execution=execution, crop=crop)
+        try:
+            start = time.perf_counter()
+            results = collector.analyze_video(video_path)
+            wall = time.perf_counter() - start
+        finally:
+            collector.close()
+    finally:
+        if cleanup:
+            os.remove(video_path)
+
+    truth = subject.truth(seconds)
+    vitals = results['physiological_vitals']
+    hr = _final(vitals['heart_rate'])
+    hr_avg = vitals['heart_rate'].get('average')
+    br = _final(vitals['breathing_rate'])
+    blinks = results['eye_attention']['blinks']
+    blink = blinks['count'] if blinks else None
+    blink_ms = blinks['mean_duration_ms'] if blinks else None
+    info = results['capture_info']
+    return {
+        'execution': execution,
+        'crop': crop,
+        'frames': info['frames_captured'],
+        'wall_seconds': round(wall, 2),
+        'effective_fps': info['effective_fps'],
+        'realtime_factor': round(info['effective_fps'] / fps, 2),
+        'estimates': {'heart_rate_final': hr, 'heart_rate_avg': hr_avg, 'breathing_rate': br, 'blink_count': blink, 'blink_duration_ms': blink_ms},
+        'errors': {
+            'heart_rate_final': _error(hr, truth['heart_rate']),
+            'heart_rate_avg': _error(hr_avg, truth['heart_rate']),
+            'breathing_rate': _error(br, truth['breathing_rate']),
+            'blink_count': _error(blink, truth['blink_count']),
+            'blink_duration_ms': _error(blink_ms, truth['blink_duration_ms']),
+        },
+        'truth': truth,
+        'stage_timing': info['stage_timing'],
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def run(seconds=20, fps=30, heart_bpm=72, breath_bpm=15, execution='inline', stages=True, pipeline=True, seed=0,
+        width=640, height=480, crop=False):
+    report = {'config': {'seconds': seconds, 'fps': fps, 'heart_bpm': heart_bpm, 'breath_bpm': breath_bpm, 'seed': seed,
+                         'resolution': f"{width}x{height}", 'crop': crop}}
+    if stages:
+        subject = SyntheticSubject(width, height, fps=fps, heart_bpm=heart_bpm, breath_bpm=breath_bpm, seed=seed)
+        report['stages'] = benchmark_stages(subject, seconds, crop=crop)
+    if pipeline:
+        subject = SyntheticSubject(width, height, fps=fps, heart_bpm=heart_bpm, breath_bpm=breath_bpm, seed=seed)
+        report['pipeline'] = benchmark_pipeline(subject, seconds, execution, crop=crop)
+    return report
+
+def print_report(report):
+    print("\n📊 VITALS BENCHMARK (synthetic subject)")
+    print("=" * 70)
+    config = report['config']
+    print(f"  {config['resolution']}, {config['seconds']}s @ {config['fps']} fps, crop={config['crop']} | HR {config['heart_bpm']} BPM | BR {config['breath_bpm']} BPM")
+
+    if 'stages' in report:
+        s = report['stages']
+        print(f"\n⏱️  PER-STAGE ({s['frames']} frames, face {s['detection']['face']:.0%}, pose {s['detection']['pose']:.0%}):")
+        print(f"  {'stage':<14}{'mean ms':>10}{'p95 ms':>10}{'fps':>10}{'peak KB':>10}")
+        for name, st in s['stages'].items():
+            if st['frames']:
+                peak = st['peak_kb'] if st['peak_kb'] is not None else '-'
+                print(f"  {name:<14}{st['mean_ms']:>10}{st['p95_ms']:>10}{st['fps']:>10}{peak:>10}")
+        for name, ms in s['finalize_ms'].items():
+            print(f"  {name:<14}{ms:>10}  (once per session)")
+        print(f"  Errors vs truth: {s['errors']}")
+        print(f"  Peak RSS: {s['peak_rss_mb']} MB")
+
+    if 'pipeline' in report:
+        p = report['pipeline']
+        print(f"\n🚀 FULL PIPELINE ({p['execution']}):")
+        print(f"  {p['frames']} frames in {p['wall_seconds']}s -> {p['effective_fps']} fps ({p['realtime_factor']}x real time)")
+        print(f"  Estimates: {p['estimates']}")
+        print(f"  Errors vs truth: {p['errors']}")
+        print(f"  Peak RSS: {p['peak_rss_mb']} MB")
+    print("=" * 70)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vitals pipeline on a synthetic subject")
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--hr', type=float, default=72, help="Ground-truth heart rate (BPM)")
+    parser.add_argument('--br', type=float, default=15, help="Ground-truth breathing rate (BPM)")
+    parser.add_argument('--execution', choices=['inline', 'process'], default='inline')
+    parser.add_argument('--skip-stages', action='store_true', help="Only run the full pipeline")
+    parser.add_argument('--skip-pipeline', action='store_true', help="Only run the per-stage benchmark")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--crop', action='store_true', help="Face-tracked crop / downscaled inference")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.seconds, args.fps, args.hr, args.br, args.execution,
+                 stages=not args.skip_stages, pipeline=not args.skip_pipeline, seed=args.seed,
+                 width=args.width, height=args.height, crop=args.crop)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+if __name__ == "__main__":
+    main()
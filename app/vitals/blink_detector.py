@@ -1,47 +1,101 @@
-import cv2
-import mediapipe as mp
 import numpy as np
-from scipy.spatial import distance
+from .ring_buffer import TimedTrace
+
+# EAR points per eye: outer corner, two upper lid, inner corner, two lower lid
+LEFT_EYE = np.array([33, 160, 158, 133, 153, 144])
+RIGHT_EYE = np.array([362, 385, 387, 263, 373, 380])
+EYES = np.stack([LEFT_EYE, RIGHT_EYE])
+
+def eye_aspect_ratio(eyes):
+    """EAR of (..., 6, 2) eye point arrays, vectorized over any leading axes"""
+    a = np.linalg.norm(eyes[..., 1, :] - eyes[..., 5, :], axis=-1)
+    b = np.linalg.norm(eyes[..., 2, :] - eyes[..., 4, :], axis=-1)
+    c = np.linalg.norm(eyes[..., 0, :] - eyes[..., 3, :], axis=-1)
+    return (a + b) / (2.0 * c)
+
+def find_blinks(times, ears, threshold=0.25, min_frames=2):
+    """Blinks in an EAR series in one vectorized pass.
+
+    A blink is a run of at least `min_frames` consecutive samples below
+    `threshold` that ends with the eye reopening (NaN samples, i.e. no face, are
+    skipped). Returns (onsets, durations, amplitudes): onset time, closed time
+    until reopening (seconds) and EAR drop from the open-eye median.
+    """
+    valid = ~np.isnan(ears)
+    times, ears = times[valid], ears[valid]
+    closed = ears < threshold
+    # Run boundaries: +1 where a closure starts, -1 where the eye reopens
+    edges = np.diff(closed.astype(np.int8), prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)  # Index of the first open sample after each run
+    starts = starts[:len(ends)]  # A closure still running at the end isn't a blink yet
+    keep = ends - starts >= min_frames
+    starts, ends = starts[keep], ends[keep]
+
+    baseline = np.median(ears[~closed]) if (~closed).any() else np.nan
+    amplitudes = np.array([baseline - ears[s:e].min() for s, e in zip(starts, ends)])
+    return times[starts], times[ends] - times[starts], amplitudes
 
 class BlinkDetector:
-    def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5)
+    def __init__(self, trace_capacity=600, fps=30):
         self.EAR_THRESHOLD = 0.25
         self.CONSEC_FRAMES = 2
+        self.fps = fps  # Only used to timestamp frames that arrive without one
         self.blink_counter = 0
-        self.frame_counter = 0
         self.counter = 0
-        
-    def eye_aspect_ratio(self, eye_landmarks):
-        A = distance.euclidean(eye_landmarks[1], eye_landmarks[5])
-        B = distance.euclidean(eye_landmarks[2], eye_landmarks[4])
-        C = distance.euclidean(eye_landmarks[0], eye_landmarks[3])
-        return (A + B) / (2.0 * C)
-    
-    def detect(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if not results.multi_face_landmarks:
+        self.first_time = None
+        self.last_time = None
+        self.ear_trace = TimedTrace(trace_capacity)  # Per-frame EAR with capture time, NaN when no face
+
+    def detect(self, context):
+        """Incremental mode: O(1) per frame, for the overlay and rolling samples"""
+        timestamp = context.timestamp if context.timestamp is not None else self.ear_trace.count / self.fps
+        if context.face_landmarks is None:
+            self.ear_trace.append(timestamp, np.nan)
             return None
-        
-        landmarks = results.multi_face_landmarks[0].landmark
-        h, w = frame.shape[:2]
-        
-        left_eye = np.array([(landmarks[i].x * w, landmarks[i].y * h) for i in [33, 160, 158, 133, 153, 144]])
-        right_eye = np.array([(landmarks[i].x * w, landmarks[i].y * h) for i in [362, 385, 387, 263, 373, 380]])
-        
-        ear = (self.eye_aspect_ratio(left_eye) + self.eye_aspect_ratio(right_eye)) / 2.0
-        self.frame_counter += 1
-        
+
+        h, w = context.h, context.w
+        eyes = context.face_landmarks[EYES, :2].astype(float) * (w, h)
+        ear = float(eye_aspect_ratio(eyes).mean())
+        self.ear_trace.append(timestamp, ear)
+        if self.first_time is None:
+            self.first_time = timestamp
+        self.last_time = timestamp
+
         if ear < self.EAR_THRESHOLD:
             self.counter += 1
         else:
             if self.counter >= self.CONSEC_FRAMES:
                 self.blink_counter += 1
             self.counter = 0
-        
-        blink_rate = (self.blink_counter / (self.frame_counter / 30)) * 60 if self.frame_counter > 30 else 0
-        
+
+        # Rate over the real time the face has been tracked (not frames / 30)
+        observed = self.last_time - self.first_time
+        blink_rate = (self.blink_counter / observed) * 60 if observed > 1.0 else 0
+
         return {'ear': round(ear, 3), 'blink_count': self.blink_counter, 'blink_rate': round(blink_rate, 1)}
+
+    def analyze(self, seconds=None):
+        """Vectorized pass over the EAR trace (last `seconds` of it if given): count, rate, duration and amplitude"""
+        times, ears = self.ear_trace.window(seconds)
+        ears = ears[:, 0]
+        face = ~np.isnan(ears)
+        if face.sum() < 2:
+            return None
+        onsets, durations, amplitudes = find_blinks(times, ears, self.EAR_THRESHOLD, self.CONSEC_FRAMES)
+        observed = times[face][-1] - times[face][0]
+        return {
+            'count': len(onsets),
+            'rate': round(len(onsets) / observed * 60, 1) if observed > 0 else 0,
+            'mean_duration_ms': round(float(durations.mean()) * 1000, 1) if len(onsets) else None,
+            'mean_amplitude': round(float(np.nanmean(amplitudes)), 3) if len(onsets) else None,
+            'onsets': [round(float(t - times[0]), 3) for t in onsets],  # Seconds from the start of the window
+            'durations_ms': [round(float(d) * 1000, 1) for d in durations],
+        }
+
+    def reset(self):
+        self.blink_counter = 0
+        self.counter = 0
+        self.first_time = None
+        self.last_time = None
+        self.ear_trace.clear()
@@ -1,29 +1,42 @@
 import numpy as np
 from scipy import signal
+from .ring_buffer import TimedTrace
+from .dsp import bandpass
+
+SHOULDERS = np.array([11, 12])
 
 class BreathingDetector:
-    def __init__(self, fps=30):
+    def __init__(self, fps=30, trace_capacity=600):
         self.fps = fps
-        
-    def estimate(self, pose_landmarks_list):
-        if len(pose_landmarks_list) < 30:
+        # Per-frame mean shoulder height (normalized y), NaN when no pose
+        self.trace = TimedTrace(trace_capacity)
+    
+    def update(self, context):
+        timestamp = context.timestamp if context.timestamp is not None else self.trace.count / self.fps
+        if context.pose_landmarks is None:
+            self.trace.append(timestamp, np.nan)
             return None
-            
-        shoulder_positions = []
-        for pose in pose_landmarks_list:
-            left = pose.landmark[11]
-            right = pose.landmark[12]
-            shoulder_positions.append((left.y + right.y) / 2)
+        left_y, right_y = context.pose_landmarks[SHOULDERS, 1].tolist()
+        shoulder_y = (left_y + right_y) / 2
+        self.trace.append(timestamp, shoulder_y)
+        return shoulder_y
+    
+    def reset(self):
+        self.trace.clear()
+        
+    def estimate(self, shoulder_positions=None, seconds=None):
+        """Breathing rate from a shoulder-height series sampled at fps; defaults to the trace resampled by capture time"""
+        if shoulder_positions is None:
+            shoulder_positions = self.trace.resampled(self.fps, seconds)
+        positions = np.asarray(shoulder_positions, dtype=float).ravel()
+        positions = positions[~np.isnan(positions)]
         
-        if len(shoulder_positions) < 30:
+        if len(positions) < 30:
             return None
             
-        positions = np.array(shoulder_positions)
         detrended = signal.detrend(positions)
         
-        nyquist = self.fps / 2
-        b, a = signal.butter(2, [0.1/nyquist, 0.5/nyquist], btype='band')
-        filtered = signal.filtfilt(b, a, detrended)
+        filtered = bandpass(detrended, self.fps, (0.1, 0.5), 2)
         
         peaks, _ = signal.find_peaks(filtered, distance=self.fps)
         
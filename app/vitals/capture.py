@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+
+DROP_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+class FrameGrabber:
+    """Reads frames on a dedicated thread into a bounded queue, stamped by `clock` (time.monotonic)
+
+    drop_policy:
+        drop_oldest - keep the freshest frames, discard the oldest queued one
+        drop_newest - keep the queued frames, discard the frame just read
+        block       - never drop; the capture thread waits (files, benchmarks)
+
+    With a `ring` (a FrameRing and the `consumer` slot reserved for the reader),
+    frames are decoded straight into the ring's shared-memory slots and read()
+    returns views of them; a view stays valid until the next read(). The ring
+    bounds the queue, and queued frames are already in the ring's consumers'
+    hands, so both drop policies discard the frame just read.
+    """
+    def __init__(self, cap, max_queue=4, drop_policy='drop_oldest', clock=time.monotonic, ring=None, consumer=None):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy} (expected one of {DROP_POLICIES})")
+        self.cap = cap
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+        self.clock = clock  # Called right after each read; files pass their own media clock
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.ring = ring
+        self.consumer = consumer
+        self._held = None  # Seq of the ring frame last returned by read()
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._finished = False
+        self.error = None  # Exception that ended the capture thread, re-raised by read()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="vitals-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            if self.ring is not None:
+                self._run_ring()
+            else:
+                self._run_queue()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+
+    def _run_queue(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            timestamp = self.clock()
+            if not ret:
+                break
+            with self._cond:
+                self.frames_read += 1
+                if len(self._queue) >= self.max_queue:
+                    if self.drop_policy == 'drop_oldest':
+                        self._queue.popleft()
+                        self.frames_dropped += 1
+                    elif self.drop_policy == 'drop_newest':
+                        self.frames_dropped += 1
+                        continue
+                    else:
+                        while self._running and len(self._queue) >= self.max_queue:
+                            self._cond.wait()
+                        if not self._running:
+                            break
+                self._queue.append((frame, timestamp))
+                self._cond.notify_all()
+
+    def _run_ring(self):
+        ring = self.ring
+        scratch = None  # Reused buffer for frames read only to be dropped
+        while self._running:
+            if self.drop_policy != 'block' and not ring.writable(ring.head + 1):
+                if scratch is None:
+                    scratch = ring.frames[0].copy()
+                ret, _ = self.cap.read(scratch)
+                if not ret:
+                    break
+                with self._cond:
+                    self.frames_read += 1
+                    self.frames_dropped += 1
+                continue
+            try:
+                seq, slot = ring.begin_write(timeout=0.1)
+            except TimeoutError:
+                continue  # Still full: re-check _running
+            ret, frame = self.cap.read(slot)
+            timestamp = self.clock()
+            if not ret:
+                break
+            if frame is not None and frame.__array_interface__['data'][0] != slot.__array_interface__['data'][0]:
+                slot[...] = frame  # The backend allocated its own buffer
+            ring.commit(seq, timestamp)
+            with self._cond:
+                self.frames_read += 1
+                self._queue.append((slot, timestamp))
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """Next (frame, timestamp) pair, or None once the source is exhausted or stopped.
+
+        If the capture thread failed, its exception is raised once the frames read before it are consumed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queue or self._finished, timeout):
+                return None
+            if not self._queue:
+                if self.error is not None:
+                    raise self.error
+                return None
+            item = self._queue.popleft()
+            self._cond.notify_all()
+        if self.ring is not None:
+            # The previous view is no longer used: let the producer reuse its slot
+            if self._held is not None:
+                self.ring.release(self.consumer, self._held)
+            self._held = self.ring.seq_of(item[0])
+        return item
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if self.ring is not None:
+            self.ring.release(self.consumer, self.ring.head)
@@ -0,0 +1,68 @@
+"""Shared signal-processing kernels for the vitals estimators.
+
+Filter banks and spectrum grids depend only on (fps, band, order) or
+(FFT size, fps, band), so they are designed once and cached; estimators that
+run many times per session (rolling BR, per-session HR/HRV, bulk video) only pay
+for the filtering and the FFT itself.
+"""
+from functools import lru_cache
+import numpy as np
+from scipy import signal
+from scipy.fft import rfft, rfftfreq, next_fast_len
+
+def resample_uniform(timestamps, values, fps):
+    """Linearly resample an irregularly timed series (NaN rows skipped) onto a uniform fps grid"""
+    timestamps = np.asarray(timestamps, dtype=float).ravel()
+    values = np.asarray(values, dtype=float)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+
+    valid = ~np.isnan(timestamps) & ~np.isnan(values).any(axis=1)
+    timestamps, values = timestamps[valid], values[valid]
+    if len(timestamps) < 2:
+        out = values
+    else:
+        grid = np.arange(timestamps[0], timestamps[-1] + 0.5 / fps, 1.0 / fps)
+        out = np.column_stack([np.interp(grid, timestamps, values[:, i]) for i in range(values.shape[1])])
+    return out[:, 0] if squeeze else out
+
+@lru_cache(maxsize=32)
+def _bandpass_sos(fps, band, order):
+    return signal.butter(order, band, btype='band', fs=fps, output='sos')
+
+def bandpass_sos(fps, band, order):
+    """Butterworth band-pass as second-order sections, cached by (fps, band, order).
+
+    The array is shared between callers and must not be modified (it stays
+    writable only because scipy's sosfilt requires a writable buffer).
+    """
+    return _bandpass_sos(float(fps), (float(band[0]), float(band[1])), int(order))
+
+def bandpass(x, fps, band, order, axis=-1):
+    """Zero-phase band-pass (forward-backward SOS filtering) with a cached filter bank"""
+    return signal.sosfiltfilt(bandpass_sos(fps, band, order), x, axis=axis)
+
+def valid_band(fps, band):
+    """True if the band lies strictly between 0 and Nyquist"""
+    return 0 < band[0] < band[1] < fps / 2
+
+@lru_cache(maxsize=64)
+def _band_grid(n_fft, fps, band):
+    freqs = rfftfreq(n_fft, 1.0 / fps)
+    idx = np.flatnonzero((freqs >= band[0]) & (freqs <= band[1]))
+    if not len(idx):
+        return freqs[:0], slice(0, 0)
+    band_freqs = freqs[idx[0]:idx[-1] + 1]
+    band_freqs.flags.writeable = False
+    return band_freqs, slice(idx[0], idx[-1] + 1)
+
+def band_spectrum(x, fps, band, oversample=1):
+    """(freqs, |X|) of a real signal restricted to `band` (Hz).
+
+    The FFT length is the next fast size >= oversample * len(x) (zero-padding
+    interpolates the spectrum); frequency grids and band slices are cached.
+    """
+    n_fft = next_fast_len(int(len(x) * oversample), real=True)
+    freqs, band_slice = _band_grid(n_fft, float(fps), (float(band[0]), float(band[1])))
+    return freqs, np.abs(rfft(x, n=n_fft)[band_slice])
@@ -4,8 +4,9 @@ class EmotionDetector:
     def __init__(self):
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         
-    def detect(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def detect(self, context):
+        # In crop mode the cascade only has to scan the tracked face crop
+        gray = cv2.cvtColor(context.face_crop, cv2.COLOR_BGR2GRAY) if context.face_crop is not None else context.gray
         faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
         
         if len(faces) == 0:
@@ -1,25 +1,19 @@
-import cv2
-import mediapipe as mp
 import numpy as np
 
+AU_Y_POINTS = np.array([13, 14, 70, 63])
+AU_X_POINTS = np.array([61, 291])
+
 class FacialActionUnits:
-    def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5)
-    
-    def detect(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if not results.multi_face_landmarks:
+    def detect(self, context):
+        if context.face_landmarks is None:
             return None
         
-        landmarks = results.multi_face_landmarks[0].landmark
-        
         # Simplified AU detection using landmark distances
-        mouth_open = abs(landmarks[13].y - landmarks[14].y)
-        eyebrow_raise = abs(landmarks[70].y - landmarks[63].y)
-        smile = abs(landmarks[61].x - landmarks[291].x)
+        upper_lip, lower_lip, brow_outer, brow_inner = context.face_landmarks[AU_Y_POINTS, 1].tolist()
+        mouth_left, mouth_right = context.face_landmarks[AU_X_POINTS, 0].tolist()
+        mouth_open = abs(upper_lip - lower_lip)
+        eyebrow_raise = abs(brow_outer - brow_inner)
+        smile = abs(mouth_left - mouth_right)
         
         aus = {
             'AU12': 1 if smile > 0.3 else 0,  # Lip corner puller (smile)
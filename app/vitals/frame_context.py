@@ -0,0 +1,162 @@
+import cv2
+import numpy as np
+import mediapipe as mp
+
+def face_array(landmark_list):
+    """NormalizedLandmarkList -> float32 (478, 3) array of normalized x, y, z"""
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmark_list.landmark], dtype=np.float32)
+
+def pose_array(landmark_list):
+    """NormalizedLandmarkList -> float32 (33, 4) array of normalized x, y, z, visibility"""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark], dtype=np.float32)
+
+class FrameContext:
+    """Landmarks and colour conversions for one frame, shared by every detector"""
+    def __init__(self, frame, rgb=None, face_landmarks=None, pose_landmarks=None, timestamp=None, face_crop=None, face_box=None, faces=None):
+        self.frame = frame
+        self._rgb = rgb
+        # Landmarks are converted once per frame into contiguous arrays (normalized,
+        # full-frame coordinates) that detectors index with precomputed index vectors
+        self.face_landmarks = face_landmarks  # float32 (478, 3) x, y, z, or None
+        self.pose_landmarks = pose_landmarks  # float32 (33, 4) x, y, z, visibility, or None
+        # Every face found (multi-subject mode); face_landmarks is the first of them
+        self.faces = faces if faces is not None else ([] if face_landmarks is None else [face_landmarks])
+        self.timestamp = timestamp  # Capture time in seconds (monotonic clock), if known
+        self.face_crop = face_crop  # Area-downsampled square BGR face crop (crop mode only)
+        self.face_box = face_box  # (x0, y0, size) of face_crop in full-frame pixels
+        self.h, self.w = frame.shape[:2]
+        self._gray = None
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+class LandmarkExtractor:
+    """Runs FaceMesh and Pose once per frame
+
+    crop=True: Pose runs on a frame downscaled to `detect_width`, and FaceMesh
+    runs on a padded square crop around the tracked face, resized to
+    `crop_size`. Whenever tracking is lost the face is re-acquired by a face
+    detector on the downscaled frame. Landmarks are mapped back to full-frame
+    coordinates.
+
+    max_faces > 1: FaceMesh returns up to that many faces from the same single
+    inference call (context.faces); crop mode tracks one face only.
+    """
+    def __init__(self, face=True, pose=True, crop=False, detect_width=320, crop_size=256, crop_padding=1.6, max_faces=1):
+        if crop and max_faces > 1:
+            raise ValueError("crop mode tracks a single face; use max_faces=1")
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=max_faces, refine_landmarks=True, min_detection_confidence=0.5) if face else None
+        self.pose = mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) if pose else None
+        self.crop = crop
+        self.detect_width = detect_width
+        self.crop_size = crop_size
+        self.crop_padding = crop_padding  # Crop side as a multiple of the face's larger extent
+        self._face_box = None  # Tracked (x0, y0, size) for the next frame
+        self.face_detector = None
+        if crop and face:
+            self.face_detector = mp.solutions.face_detection.FaceDetection(model_selection=0, min_detection_confidence=0.5)
+
+    def process(self, frame, timestamp=None):
+        if self.crop:
+            return self._process_cropped(frame, timestamp)
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False  # Lets MediaPipe wrap the buffer without copying
+
+        faces = []
+        if self.face_mesh is not None:
+            results = self.face_mesh.process(rgb)
+            if results.multi_face_landmarks:
+                faces = [face_array(face) for face in results.multi_face_landmarks]
+
+        pose_landmarks = None
+        if self.pose is not None:
+            results = self.pose.process(rgb)
+            if results.pose_landmarks:
+                pose_landmarks = pose_array(results.pose_landmarks)
+
+        return FrameContext(frame, rgb, faces[0] if faces else None, pose_landmarks, timestamp, faces=faces)
+
+    def _process_cropped(self, frame, timestamp):
+        h, w = frame.shape[:2]
+        # Strided view: free to take, and the detectors don't need anti-aliasing.
+        # Normalized landmarks are scale-free, so nothing needs remapping
+        step = max(1, w // self.detect_width)
+        small_rgb = cv2.cvtColor(frame[::step, ::step], cv2.COLOR_BGR2RGB)
+        small_rgb.flags.writeable = False
+
+        pose_landmarks = None
+        if self.pose is not None:
+            results = self.pose.process(small_rgb)
+            if results.pose_landmarks:
+                pose_landmarks = pose_array(results.pose_landmarks)
+
+        face_landmarks, face_crop, face_box = None, None, None
+        if self.face_mesh is not None:
+            box = self._face_box
+            if box is None:
+                box = self._detect_box(small_rgb, w, h)
+            if box is not None:
+                x0, y0, size = box
+                face_crop = cv2.resize(frame[y0:y0 + size, x0:x0 + size], (self.crop_size, self.crop_size),
+                                       interpolation=cv2.INTER_AREA if size > self.crop_size else cv2.INTER_LINEAR)
+                crop_rgb = cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB)
+                crop_rgb.flags.writeable = False
+                results = self.face_mesh.process(crop_rgb)
+                if results.multi_face_landmarks:
+                    # Crop-normalized -> frame-normalized (z shares x's scale)
+                    face_landmarks = face_array(results.multi_face_landmarks[0])
+                    face_landmarks *= np.array([size / w, size / h, size / w], dtype=np.float32)
+                    face_landmarks[:, 0] += x0 / w
+                    face_landmarks[:, 1] += y0 / h
+                    face_box = box
+                else:
+                    face_crop = None
+            self._face_box = self._track_box(face_landmarks, w, h)
+
+        return FrameContext(frame, None, face_landmarks, pose_landmarks, timestamp, face_crop, face_box)
+
+    def _detect_box(self, small_rgb, w, h):
+        """Acquire the face on the downscaled frame; returns a crop box or None"""
+        results = self.face_detector.process(small_rgb)
+        if not results.detections:
+            return None
+        box = results.detections[0].location_data.relative_bounding_box
+        return self._square_box(box.xmin * w, (box.xmin + box.width) * w, box.ymin * h, (box.ymin + box.height) * h, w, h)
+
+    def _track_box(self, face_landmarks, w, h):
+        """Crop box for the next frame from this frame's landmarks; None when no face"""
+        if face_landmarks is None:
+            return None
+        (x_min, y_min), (x_max, y_max) = face_landmarks[:, :2].min(axis=0), face_landmarks[:, :2].max(axis=0)
+        return self._square_box(x_min * w, x_max * w, y_min * h, y_max * h, w, h)
+
+    def _square_box(self, x_min, x_max, y_min, y_max, w, h):
+        """Padded square around a face extent, shifted to lie inside the frame"""
+        size = int(min(max(x_max - x_min, y_max - y_min) * self.crop_padding, w, h))
+        if size < 16:
+            return None
+        x0 = int(min(max((x_min + x_max - size) / 2, 0), w - size))
+        y0 = int(min(max((y_min + y_max - size) / 2, 0), h - size))
+        return x0, y0, size
+
+    def reset(self):
+        """Forget the tracked face box before a new session"""
+        self._face_box = None
+        
+    def close(self):
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+        if self.face_detector is not None:
+            self.face_detector.close()
+        if self.pose is not None:
+            self.pose.close()
@@ -0,0 +1,201 @@
+"""Fixed-size shared-memory ring of frame slots: one producer, several consumer processes.
+
+Layout of the shared block (all preallocated, nothing is pickled per frame):
+    header     int64 [head, closed, cursor_0 .. cursor_{k-1}]
+    seqs       int64 per slot: sequence number held by the slot (0 = being written)
+    timestamps float64 per slot
+    frames     uint8 (slots, h, w, 3)
+
+Protocol:
+    - The producer writes sequence numbers 1, 2, ... into slot seq % slots. It
+      marks the slot 0 while copying, then publishes the slot's seq and finally
+      advances `head`.
+    - Consumer i reads views straight out of the slots. It releases a frame by
+      storing its seq in cursor_i (-1 = unregistered).
+    - With block=True the producer never overwrites a frame an active consumer
+      hasn't released.
+    - Without block, readers detect a lapped slot because its seq no longer matches.
+    - Waiting sides poll, backing off from poll_interval to max_poll_interval
+      while nothing changes, so an idle ring costs almost no CPU.
+"""
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+_HEAD, _CLOSED, _CURSORS = 0, 1, 2
+_ALIGN = 64
+
+def _layout(shape, slots, max_consumers):
+    header = (_CURSORS + max_consumers) * 8
+    seqs = header
+    timestamps = seqs + slots * 8
+    frames = -(-(timestamps + slots * 8) // _ALIGN) * _ALIGN
+    return seqs, timestamps, frames, frames + slots * int(np.prod(shape))
+
+class FrameRing:
+    """Shared-memory frame slots with sequence numbers and timestamps.
+
+    The owner creates the ring and registers consumers before starting them;
+    consumer processes attach with FrameRing(**ring.spec, create=False).
+    """
+    def __init__(self, shape, slots=8, max_consumers=4, name=None, create=True, poll_interval=0.0005, max_poll_interval=0.005):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.max_consumers = max_consumers
+        self.poll_interval = poll_interval  # First wait; doubles up to max_poll_interval while idle
+        self.max_poll_interval = max_poll_interval
+        self.owner = create
+        seqs, timestamps, frames, size = _layout(self.shape, slots, max_consumers)
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        buf = self._shm.buf
+        self._header = np.ndarray((_CURSORS + max_consumers,), dtype=np.int64, buffer=buf)
+        self._seqs = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=seqs)
+        self._timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=timestamps)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=frames)
+        if create:
+            self._header[:] = 0
+            self._header[_CURSORS:] = -1
+            self._seqs[:] = -1
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def spec(self):
+        """Picklable arguments for attaching to this ring from another process"""
+        return {'shape': self.shape, 'slots': self.slots, 'max_consumers': self.max_consumers, 'name': self.name}
+
+    @property
+    def head(self):
+        """Sequence number of the newest published frame (0 before the first)"""
+        return int(self._header[_HEAD])
+
+    @property
+    def closed(self):
+        return bool(self._header[_CLOSED])
+
+    # Producer side
+
+    def register(self, consumer):
+        """Activate consumer slot `consumer`; it starts after the current head"""
+        self._header[_CURSORS + consumer] = self.head
+
+    def unregister(self, consumer):
+        self._header[_CURSORS + consumer] = -1
+
+    def writable(self, seq):
+        """True once every active consumer has released the frame `seq` would overwrite"""
+        cursors = self._header[_CURSORS:]
+        active = cursors[cursors >= 0]
+        return not len(active) or seq - self.slots <= active.min()
+
+    def begin_write(self, block=True, timeout=None):
+        """(seq, writable slot view) for the next frame; capture can fill it in place, then commit()"""
+        seq = self.head + 1
+        if block and not self.writable(seq):
+            deadline = None if timeout is None else time.monotonic() + timeout
+            delay = self.poll_interval
+            while not self.writable(seq):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"Frame ring full: a consumer still holds frame {seq - self.slots}")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_poll_interval)
+        slot = seq % self.slots
+        self._seqs[slot] = 0  # Readers treat the slot as unavailable while it is being written
+        return seq, self.frames[slot]
+
+    def commit(self, seq, timestamp=None):
+        """Publish frame `seq` (after begin_write and filling the slot)"""
+        slot = seq % self.slots
+        self._timestamps[slot] = np.nan if timestamp is None else timestamp
+        self._seqs[slot] = seq
+        self._header[_HEAD] = seq
+
+    def write(self, frame, timestamp=None, block=True, timeout=None):
+        """Copy `frame` into the next slot and publish it; returns its sequence number"""
+        seq, slot = self.begin_write(block, timeout)
+        slot[...] = frame
+        self.commit(seq, timestamp)
+        return seq
+
+    def seq_of(self, frame):
+        """Sequence number of the published frame `frame` is a slot view of, or None for any other array"""
+        if frame.shape != self.shape or frame.strides != self.frames.strides[1:]:
+            return None
+        offset = frame.__array_interface__['data'][0] - self.frames.__array_interface__['data'][0]
+        size = self.frames[0].nbytes
+        if offset < 0 or offset % size or offset // size >= self.slots:
+            return None
+        seq = int(self._seqs[offset // size])
+        return seq if seq > 0 else None
+
+    def close_stream(self):
+        """Tell consumers no more frames are coming"""
+        self._header[_CLOSED] = 1
+
+    # Consumer side
+
+    def read(self, seq):
+        """(view, timestamp) of frame `seq` without copying, or None if it isn't (or is no longer) in the ring"""
+        slot = seq % self.slots
+        if self._seqs[slot] != seq:
+            return None
+        return self.frames[slot], float(self._timestamps[slot])
+
+    def valid(self, seq):
+        """True while frame `seq` is still intact (check after using an unprotected view)"""
+        return self._seqs[seq % self.slots] == seq
+
+    def release(self, consumer, seq):
+        self._header[_CURSORS + consumer] = seq
+
+    def reader(self, consumer, latest=False):
+        return FrameRingReader(self, consumer, latest)
+
+    def close(self):
+        """Detach from the shared block; the owner also frees it"""
+        self._header = self._seqs = self._timestamps = self.frames = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+class FrameRingReader:
+    """Iterates one consumer's frames. Each view stays valid until the next call to next().
+
+    latest=False: every frame in order (lapped frames are skipped and counted).
+    latest=True: jump to the newest frame (live preview style consumers).
+    """
+    def __init__(self, ring, consumer, latest=False):
+        self.ring = ring
+        self.consumer = consumer
+        self.latest = latest
+        self.position = max(int(ring._header[_CURSORS + consumer]), 0)
+        self.skipped = 0
+
+    def next(self, timeout=None):
+        """(seq, frame view, timestamp) of the next frame, or None once the stream is closed (or on timeout)"""
+        ring = self.ring
+        ring.release(self.consumer, self.position)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = ring.poll_interval
+        while True:
+            head = ring.head
+            if head > self.position:
+                seq = head if self.latest else max(self.position + 1, head - ring.slots + 1)
+                item = ring.read(seq)
+                if item is not None:
+                    self.skipped += seq - self.position - 1
+                    self.position = seq
+                    return (seq,) + item
+                if not self.latest:
+                    # Overwritten between the head check and the read: move on to what is still there
+                    self.skipped += 1
+                    self.position = seq
+                    continue
+            elif ring.closed:
+                return None
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, ring.max_poll_interval)
@@ -1,30 +1,17 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 
+# Nose tip, chin, eye corners, mouth corners
+HEAD_POSE_POINTS = np.array([1, 152, 33, 263, 61, 291])
+
 class HeadPoseEstimator:
-    def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5)
-    
-    def estimate(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if not results.multi_face_landmarks:
+    def estimate(self, context):
+        if context.face_landmarks is None:
             return None
         
-        landmarks = results.multi_face_landmarks[0].landmark
-        h, w = frame.shape[:2]
-        
-        image_points = np.array([
-            (landmarks[1].x * w, landmarks[1].y * h),
-            (landmarks[152].x * w, landmarks[152].y * h),
-            (landmarks[33].x * w, landmarks[33].y * h),
-            (landmarks[263].x * w, landmarks[263].y * h),
-            (landmarks[61].x * w, landmarks[61].y * h),
-            (landmarks[291].x * w, landmarks[291].y * h)
-        ], dtype="double")
+        h, w = context.h, context.w
+        
+        image_points = context.face_landmarks[HEAD_POSE_POINTS, :2].astype("double") * (w, h)
         
         model_points = np.array([
             (0.0, 0.0, 0.0), (0.0, -330.0, -65.0),
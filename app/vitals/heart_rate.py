@@ -1,6 +1,6 @@
 import numpy as np
 from scipy import signal
-from scipy.fft import fft
+from .dsp import bandpass, band_spectrum
 
 class HeartRateDetector:
     def __init__(self, fps=30):
@@ -18,16 +18,9 @@ class HeartRateDetector:
         green_values = np.array(green_values)
         detrended = signal.detrend(green_values)
         
-        nyquist = self.fps / 2
-        b, a = signal.butter(3, [0.7/nyquist, 4.0/nyquist], btype='band')
-        filtered = signal.filtfilt(b, a, detrended)
+        filtered = bandpass(detrended, self.fps, (0.7, 4.0), 3)
         
-        fft_data = np.abs(fft(filtered))
-        freqs = np.fft.fftfreq(len(filtered), 1/self.fps)
-        
-        valid_idx = np.where((freqs >= 0.7) & (freqs <= 4.0))
-        valid_fft = fft_data[valid_idx]
-        valid_freqs = freqs[valid_idx]
+        valid_freqs, valid_fft = band_spectrum(filtered, self.fps, (0.7, 4.0))
         
         if len(valid_fft) == 0:
             return None
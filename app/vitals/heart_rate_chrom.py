@@ -1,52 +1,71 @@
 import cv2
 import numpy as np
 from scipy import signal
-from scipy.fft import fft
-import mediapipe as mp
+from .ring_buffer import TimedTrace
+from .dsp import bandpass, band_spectrum, valid_band
+
+# Forehead ROI outline
+ROI_POINTS = np.array([10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288])
 
 class CHROMHeartRate:
-    def __init__(self, fps=30):
+    def __init__(self, fps=30, trace_capacity=600):
         self.fps = fps
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5)
+        # Per-frame forehead ROI RGB means, so no frame is ever re-run through FaceMesh
+        self.trace = TimedTrace(trace_capacity, width=3)
     
-    def extract_face_roi(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if not results.multi_face_landmarks:
+    def extract_face_roi(self, context):
+        if context.face_landmarks is None:
             return None
         
-        h, w, _ = frame.shape
-        landmarks = results.multi_face_landmarks[0]
-        roi_indices = [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288]
+        h, w = context.h, context.w
+        points = context.face_landmarks[ROI_POINTS, :2].astype(float) * (w, h)
         
-        points = [(int(landmarks.landmark[i].x * w), int(landmarks.landmark[i].y * h)) for i in roi_indices]
-        x_coords, y_coords = [p[0] for p in points], [p[1] for p in points]
-        x_min, x_max = max(0, min(x_coords)), min(w, max(x_coords))
-        y_min, y_max = max(0, min(y_coords)), min(h, max(y_coords))
+        if context.face_crop is not None:
+            # Area-downsampled crop: same ROI mean for a fraction of the pixels
+            frame = context.face_crop
+            x0, y0, size = context.face_box
+            points = (points - (x0, y0)) * (frame.shape[1] / size)
+            h, w = frame.shape[:2]
+        else:
+            frame = context.frame
+        points = points.astype(int)  # Truncates like int() on each coordinate
+        x_min, y_min = np.maximum(points.min(axis=0), 0)
+        x_max, y_max = np.minimum(points.max(axis=0), (w, h))
         
         return frame[y_min:y_max, x_min:x_max]
     
-    def estimate(self, frames):
-        rgb_means = []
-        valid_frames = 0
-        
-        # Extract RGB from valid frames
-        for frame in frames:
-            roi = self.extract_face_roi(frame)
-            if roi is not None and roi.size > 200:  # Larger minimum ROI
-                r = np.mean(roi[:, :, 2])
-                g = np.mean(roi[:, :, 1])
-                b = np.mean(roi[:, :, 0])
-                if r > 10 and g > 10 and b > 10:  # Valid RGB threshold
-                    rgb_means.append([r, g, b])
-                    valid_frames += 1
-        
-        if valid_frames < 120:  # Need at least 4 seconds
+    def roi_mean(self, context):
+        """Mean [R, G, B] of the face ROI, or None if the ROI is unusable"""
+        roi = self.extract_face_roi(context)
+        if roi is None or roi.size <= 200:  # Larger minimum ROI
+            return None
+        b, g, r = cv2.mean(roi)[:3]
+        if r > 10 and g > 10 and b > 10:  # Valid RGB threshold
+            return [r, g, b]
+        return None
+    
+    def update(self, context):
+        """Append this frame's ROI mean to the trace (NaN row when no valid face)"""
+        rgb = self.roi_mean(context)
+        timestamp = context.timestamp if context.timestamp is not None else self.trace.count / self.fps
+        self.trace.append(timestamp, rgb if rgb is not None else np.nan)
+        return rgb
+    
+    def reset(self):
+        self.trace.clear()
+    
+    def estimate(self, rgb_means=None, seconds=None):
+        """Heart rate from an (N, 3) array of RGB means sampled at fps.
+
+        Defaults to the trace (last `seconds` of it if given), resampled by capture time.
+        """
+        if rgb_means is None:
+            rgb_means = self.trace.resampled(self.fps, seconds)
+        rgb_means = np.asarray(rgb_means, dtype=float)
+        rgb_means = rgb_means[~np.isnan(rgb_means).any(axis=1)]
+        
+        if len(rgb_means) < 120:  # Need at least 4 seconds
             return None
-        
-        rgb_means = np.array(rgb_means)
         
         # Temporal normalization
         rgb_norm = np.zeros_like(rgb_means, dtype=float)
@@ -70,16 +89,11 @@ class CHROMHeartRate:
         Y = np.convolve(Y, np.ones(window)/window, mode='same')
         
         # Bandpass filter (0.7-3.5 Hz = 42-210 BPM)
-        nyquist = self.fps / 2
-        low = 0.7 / nyquist
-        high = 3.5 / nyquist
-        
-        if low >= 1 or high >= 1 or low <= 0 or high <= 0:
+        band = (0.7, 3.5)
+        if not valid_band(self.fps, band):
             return None
-            
-        b, a = signal.butter(4, [low, high], btype='band')  # 4th order for better filtering
-        X_f = signal.filtfilt(b, a, X)
-        Y_f = signal.filtfilt(b, a, Y)
+        
+        X_f, Y_f = bandpass(np.vstack([X, Y]), self.fps, band, 4)  # 4th order for better filtering
         
         # Calculate alpha with regularization
         std_x = np.std(X_f)
@@ -96,21 +110,12 @@ class CHROMHeartRate:
         # Normalize pulse signal
         pulse_signal = (pulse_signal - np.mean(pulse_signal)) / (np.std(pulse_signal) + 1e-6)
         
-        # FFT with zero-padding for better frequency resolution
-        N = len(pulse_signal)
-        N_padded = 2 ** int(np.ceil(np.log2(N * 4)))  # Zero-pad to next power of 2
-        fft_data = np.abs(fft(pulse_signal, n=N_padded))[:N_padded//2]
-        freqs = np.fft.fftfreq(N_padded, 1/self.fps)[:N_padded//2]
-        
-        # Find peak in valid range
-        valid_idx = np.where((freqs >= 0.7) & (freqs <= 3.5))[0]
+        # Real FFT with ~4x zero-padding for better frequency resolution, limited to the valid range
+        valid_freqs, valid_fft = band_spectrum(pulse_signal, self.fps, band, oversample=4)
         
-        if len(valid_idx) == 0:
+        if len(valid_fft) == 0:
             return None
         
-        valid_fft = fft_data[valid_idx]
-        valid_freqs = freqs[valid_idx]
-        
         # Find top 3 peaks and use the strongest
         peaks_idx = signal.find_peaks(valid_fft, height=np.max(valid_fft) * 0.3)[0]
         
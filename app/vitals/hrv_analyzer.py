@@ -1,5 +1,6 @@
 import numpy as np
 from scipy import signal
+from .dsp import bandpass
 
 class HRVAnalyzer:
     def __init__(self, fps=30):
@@ -12,9 +13,7 @@ class HRVAnalyzer:
         signal_data = np.array(green_values)
         detrended = signal.detrend(signal_data)
         
-        nyquist = self.fps / 2
-        b, a = signal.butter(3, [0.7/nyquist, 4.0/nyquist], btype='band')
-        filtered = signal.filtfilt(b, a, detrended)
+        filtered = bandpass(detrended, self.fps, (0.7, 4.0), 3)
         
         peaks, _ = signal.find_peaks(filtered, distance=self.fps * 0.5)
         
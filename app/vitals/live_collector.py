@@ -3,37 +3,95 @@ import time
 import json
 import numpy as np
 from .heart_rate_chrom import CHROMHeartRate
+from .streaming_hr import StreamingCHROM
 from .breathing_rate import BreathingDetector
 from .blink_detector import BlinkDetector
 from .hrv_analyzer import HRVAnalyzer
 from .emotion import EmotionDetector
-from .pose_extractor import PoseExtractor
 from .gaze_tracker import GazeTracker
 from .head_pose_estimator import HeadPoseEstimator
 from .posture_analyzer import PostureAnalyzer
 from .movement_detector import MovementDetector
 from .facial_action_units import FacialActionUnits
+from .frame_context import FrameContext, LandmarkExtractor
+from .capture import FrameGrabber
+from .parallel import HOST, ParallelLandmarkExtractor
+from .timing import StageTimer
+from .scheduler import DetectorScheduler, FINALIZE
+from .tracking import MultiSubjectTracker
+from .sinks import NullSink, WindowSink
 
 class LiveVitalsCollector:
-    def __init__(self, duration=10, fps=30, sample_interval=30, vital_sample_interval=60, headless=False):
+    def __init__(self, duration=10, fps=30, sample_interval=30, vital_sample_interval=60, headless=False, history_seconds=30, max_queue=4, drop_policy='drop_oldest', execution='inline', timing_callback=None, crop=False, overlay_interval=5, presence_probe=5, max_subjects=1, sink=None):
         self.duration = duration
         self.fps = fps
         self.sample_interval = sample_interval  # Sample behavioral metrics every 1s
         self.vital_sample_interval = vital_sample_interval  # Sample vitals every 2s
         self.headless = headless  # No GUI display
-        
-        self.hr_detector = CHROMHeartRate(fps)
-        self.br_detector = BreathingDetector(fps)
-        self.blink_detector = BlinkDetector()
+        # Where annotated frames go (WindowSink, RecorderSink, NullSink); headless defaults to none
+        self.sink = sink if sink is not None else (NullSink() if headless else WindowSink())
+        self.max_queue = max_queue  # Frames buffered between the capture thread and analysis
+        self.drop_policy = drop_policy  # What to drop when analysis falls behind
+        
+        # Frames are never stored: per-frame features go into fixed-size ring buffers,
+        # so memory stays flat however long the session runs
+        history_frames = min(duration, history_seconds) * fps
+        
+        # One FaceMesh + Pose pass per frame, shared by all detectors.
+        # execution='process' runs the two graphs in parallel worker processes;
+        # crop=True runs them on a downscaled frame and a tracked face crop;
+        # max_subjects > 1 has the same FaceMesh call return up to that many faces
+        if execution == 'process':
+            # Ring slots: the capture queue, plus the frame being analyzed and one the grabber fills
+            self.landmarks = ParallelLandmarkExtractor(max_pending=max_queue + 2, crop=crop, max_faces=max_subjects)
+        elif execution == 'inline':
+            self.landmarks = LandmarkExtractor(crop=crop, max_faces=max_subjects)
+        else:
+            raise ValueError(f"Unknown execution mode: {execution}")
+        self.execution = execution
+        # Latency of every detector call and aggregation step; timing_callback(stage, seconds) mirrors each one
+        self.timer = StageTimer(history_frames, timing_callback)
+        self.hr_detector = CHROMHeartRate(fps, trace_capacity=history_frames)
+        self.live_hr = StreamingCHROM(fps)  # Per-frame HR for the overlay and rolling samples
+        self.br_detector = BreathingDetector(fps, trace_capacity=history_frames)
+        self.blink_detector = BlinkDetector(trace_capacity=history_frames, fps=fps)
         self.hrv_analyzer = HRVAnalyzer(fps)
         self.emotion_detector = EmotionDetector()
-        self.pose_extractor = PoseExtractor()
         self.gaze_tracker = GazeTracker()
         self.head_pose = HeadPoseEstimator()
         self.posture = PostureAnalyzer()
         self.movement = MovementDetector()
         self.facial_au = FacialActionUnits()
         
+        # Each detector runs only when its output is used. Traces and blink counting
+        # need every frame; the stateless behavioral detectors run on the sampling
+        # frames, plus every overlay_interval frames when a sink shows the overlay
+        overlay_every = overlay_interval if self.sink.wants_frames else 0
+        self.presence_probe = presence_probe  # With nobody in frame, run landmarks only every N frames
+        self.scheduler = (DetectorScheduler(self.timer)
+            .add('hr_roi', self.hr_detector.update)
+            .add('hr_streaming', self._update_live_hr)
+            .add('breathing', self.br_detector.update)
+            .add('blink', self.blink_detector.detect)
+            .add('movement', self.movement.detect)
+            .add('gaze', self.gaze_tracker.detect, every=overlay_every, on=('behavioral',), needs='face')
+            .add('head_pose', self.head_pose.estimate, every=overlay_every, on=('behavioral',), needs='face')
+            .add('posture', self.posture.analyze, every=overlay_every, on=('behavioral',), needs='pose')
+            # No FaceMesh gate: the emotion detector's own Haar cascade decides whether there is a face
+            .add('emotion', self.emotion_detector.detect, every=overlay_every, on=('behavioral',))
+            .add('facial_au', self.facial_au.detect, every=overlay_every, on=('behavioral',), needs='face')
+            .add('hr_estimate', self.hr_detector.estimate, every=FINALIZE)
+            .add('br_estimate', self.br_detector.estimate, every=FINALIZE)
+            .add('hrv', self._calculate_hrv, every=FINALIZE)
+            .add('blink_events', self.blink_detector.analyze, every=FINALIZE))
+        
+        # Multi-subject mode: every face gets a stable track ID and its own HR / BR / blink
+        # state; the single-subject pipeline above follows the primary track
+        self.max_subjects = max_subjects
+        self.subjects = None
+        if max_subjects > 1:
+            self.subjects = MultiSubjectTracker(fps, trace_capacity=history_frames)
+        
         # Sample storage for rich data
         self.emotion_samples = []
         self.posture_samples = []
@@ -47,204 +105,373 @@ class LiveVitalsCollector:
         self.br_samples = []
         self.blink_samples = []
         
-        # Continuous data for HRV
-        self.all_frames = []
-        self.all_pose_landmarks = []
+        self.progress_interval = 0.5  # Seconds of capture between 'capturing' progress events
+        self._progress = None
         
-    def collect(self):
-        cap = cv2.VideoCapture(0)
+    def collect(self, source=0, progress=None):
+        """Live session on a camera index or device path (files: use analyze_video).
+        
+        progress: optional queue that receives the session's progress events (see _publish)
+        """
+        self._progress = progress
+        cap = cv2.VideoCapture(source)
         if not cap.isOpened():
-            print("❌ Cannot access webcam")
+            print(f"❌ Cannot access camera: {source}")
+            self._publish('done', results=None)
             return None
         
         print(f"📹 Collecting vitals for {self.duration} seconds...")
         
-        frames = []
-        pose_landmarks = []
+        if self.execution == 'process':
+            # Spawn the workers before the clock starts so model loading isn't counted as capture
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width and height:
+                self.landmarks.start((height, width, 3))
         
-        target_frames = self.duration * self.fps
+        grabber = FrameGrabber(cap, max_queue=self.max_queue, drop_policy=self.drop_policy, **self._capture_ring()).start()
+        # Overlay drawing and display happen on the sink's own thread (WindowSink on macOS: in submit)
+        sink = self.sink.start(self._draw_overlay)
         start_time = time.time()
-        frame_count = 0
+        self.begin_session(progress)
         
-        while frame_count < target_frames:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frames.append(frame)
-            frame_count += 1
-            
-            # Store all data for final analysis
-            self.all_frames.append(frame)
-            
-            # Extract pose
-            pose = self.pose_extractor.extract(frame)
-            if pose is not None:
-                pose_landmarks.append(pose)
-                self.all_pose_landmarks.append(pose)
-            
-            # Real-time metrics for display
-            blink_result = self.blink_detector.detect(frame)
-            gaze_result = self.gaze_tracker.detect(frame)
-            head_pose_result = self.head_pose.estimate(frame)
-            posture_result = self.posture.analyze(frame)
-            movement_result = self.movement.detect(frame)
-            emotion_result = self.emotion_detector.detect(frame)
-            au_result = self.facial_au.detect(frame)
-            
-            # Sample vital signs every 2 seconds
-            if frame_count % self.vital_sample_interval == 0 and frame_count >= self.vital_sample_interval:
-                # Calculate HR from frames so far
-                hr_temp = self.hr_detector.estimate(self.all_frames[-self.vital_sample_interval*2:])
-                if hr_temp:
-                    self.hr_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'value': hr_temp
-                    })
-                
-                # Calculate BR from pose so far
-                br_temp = self.br_detector.estimate(self.all_pose_landmarks[-self.vital_sample_interval*2:])
-                if br_temp:
-                    self.br_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'value': br_temp
-                    })
-                
-                # Blink rate at this point
-                if blink_result:
-                    self.blink_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'rate': blink_result['blink_rate'],
-                        'count': blink_result['blink_count']
-                    })
-            
-            # Sample at intervals for rich data
-            if frame_count % self.sample_interval == 0:
-                if emotion_result:
-                    self.emotion_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'emotion': emotion_result['emotion'],
-                        'confidence': emotion_result['confidence']
-                    })
-                if posture_result:
-                    self.posture_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'status': posture_result['status'],
-                        'score': posture_result['score'],
-                        'shoulder_slope': posture_result['shoulder_slope'],
-                        'forward_lean': posture_result['forward_lean']
-                    })
-                if head_pose_result:
-                    self.head_pose_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'pitch': head_pose_result['pitch'],
-                        'yaw': head_pose_result['yaw'],
-                        'roll': head_pose_result['roll']
-                    })
-                if gaze_result:
-                    self.gaze_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'direction': gaze_result['direction'],
-                        'ratio': gaze_result['ratio']
-                    })
-                if movement_result:
-                    self.movement_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'fidget_level': movement_result['fidget_level'],
-                        'restlessness_score': movement_result['restlessness_score']
-                    })
-                if au_result:
-                    self.au_samples.append({
-                        'timestamp': frame_count / self.fps,
-                        'count': au_result['count'],
-                        'units': au_result['action_units']
-                    })
-            
-            # Display on frame
-            elapsed = frame_count / self.fps
-            y = 30
-            cv2.putText(frame, f"Recording: {elapsed:.1f}s / {self.duration}s", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-            y += 30
-            
-            # Show latest vital samples
-            if self.hr_samples:
-                cv2.putText(frame, f"HR: {self.hr_samples[-1]['value']:.1f} BPM", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if self.br_samples:
-                cv2.putText(frame, f"BR: {self.br_samples[-1]['value']:.1f} BPM", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if blink_result:
-                cv2.putText(frame, f"Blinks: {blink_result['blink_count']} | Rate: {blink_result['blink_rate']:.1f}/min", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if gaze_result:
-                cv2.putText(frame, f"Gaze: {gaze_result['direction']}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if head_pose_result:
-                cv2.putText(frame, f"Head: P{head_pose_result['pitch']:.0f} Y{head_pose_result['yaw']:.0f} R{head_pose_result['roll']:.0f}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if posture_result:
-                color = (0, 255, 0) if posture_result['status'] == 'GOOD' else (0, 0, 255)
-                cv2.putText(frame, f"Posture: {posture_result['status']} ({posture_result['score']}%)", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-                y += 25
-            
-            if movement_result:
-                cv2.putText(frame, f"Movement: {movement_result['fidget_level']}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if emotion_result:
-                cv2.putText(frame, f"Emotion: {emotion_result['emotion']}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                y += 25
-            
-            if au_result:
-                cv2.putText(frame, f"Facial AUs: {au_result['count']} active", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-            
-            # Only show window if not headless
-            if not self.headless:
-                cv2.imshow('Vitals Collection', frame)
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
+        try:
+            while True:
+                item = grabber.read()  # Raises if the capture thread failed
+                if item is None:
                     break
-            else:
-                # In headless mode, just wait 1ms
-                cv2.waitKey(1)
-        
-        # Force close all windows
-        cap.release()
-        for _ in range(5):
-            cv2.destroyAllWindows()
-            cv2.waitKey(1)
-        
-        cap.release()
-        cv2.destroyAllWindows()
+                frame, timestamp = item
+                frame_results = self.process_frame(frame, timestamp)
+                if frame_results is None:
+                    break
+                if sink.wants_frames:
+                    # A ring view is reused once the next frame is read; the sink keeps frames longer
+                    sink.submit(frame if grabber.ring is None else frame.copy(), frame_results)
+                    if sink.stopped:  # 'q' in the window
+                        break
+        finally:
+            grabber.stop()
+            cap.release()
+            sink.close()
         
         capture_time = time.time() - start_time
-        print(f"✅ Captured {len(frames)} frames in {capture_time:.1f}s")
+        print(f"✅ Captured {self._frame_count} frames in {capture_time:.1f}s")
         print("\n🔍 Analyzing vitals...")
         
-        # Analyze vitals
-        hr = self.hr_detector.estimate(frames)
-        br = self.br_detector.estimate(pose_landmarks)
-        blink_final = self.blink_detector.detect(frames[-1]) if frames else None
-        emotion = self.emotion_detector.detect(frames[-1]) if frames else None
-        au_result = self.facial_au.detect(frames[-1]) if frames else None
+        results = self._finalize(capture_time, capture_time, grabber.frames_read, grabber.frames_dropped, grabber.drop_policy)
+        self._publish('done', results=results)
         
-        # Calculate HRV
-        hrv_result = self._calculate_hrv(frames)
+        # A UI listening on `progress` shows its own summary
+        if progress is None:
+            self._display_results(results)
+        
+        return results
+    
+    def analyze_video(self, video_path, progress=None):
+        """Run the full pipeline over a video file as fast as decoding and inference allow"""
+        self._progress = progress
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            print(f"❌ Cannot open video: {video_path}")
+            self._publish('done', results=None)
+            return None
+        
+        # Timestamps come from the file itself, not the wall clock
+        file_fps = cap.get(cv2.CAP_PROP_FPS) or self.fps
+        decoded = [0]
+        
+        def media_clock():
+            decoded[0] += 1
+            msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            return msec / 1000 if msec > 0 else (decoded[0] - 1) / file_fps
+        
+        # 'block' so every decoded frame is analyzed; decoding still overlaps inference
+        if self.execution == 'process':
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width and height:
+                self.landmarks.start((height, width, 3))
+        grabber = FrameGrabber(cap, max_queue=self.max_queue, drop_policy='block', clock=media_clock, **self._capture_ring()).start()
+        start_time = time.time()
+        self.begin_session(progress)
+        
+        try:
+            while True:
+                item = grabber.read()  # Raises if decoding failed
+                if item is None:
+                    break
+                if self.process_frame(*item) is None:
+                    break
+        finally:
+            grabber.stop()
+            cap.release()
+        
+        results = self._finalize(self._elapsed, time.time() - start_time, grabber.frames_read, grabber.frames_dropped, grabber.drop_policy)
+        results["capture_info"]["source"] = str(video_path)
+        results["capture_info"]["source_fps"] = round(file_fps, 2)
+        self._publish('done', results=results)
+        return results
+    
+    def warm(self):
+        """Initialize the landmark graphs on a blank frame so the first session starts fast.
+
+        Process execution is left alone: its workers and frame ring are sized for the
+        source's real frame shape when a session starts.
+        """
+        if self.execution == 'inline':
+            self.landmarks.process(np.zeros((240, 320, 3), dtype=np.uint8))
+    
+    def _capture_ring(self):
+        """FrameGrabber arguments that decode straight into the landmark workers' ring (process execution, once started)"""
+        ring = self.landmarks.ring if self.execution == 'process' else None
+        return {'ring': ring, 'consumer': HOST} if ring is not None else {}
+    
+    def reset(self):
+        """Clear every per-session state (traces, blink counters, movement history, samples) but keep the models"""
+        for component in (self.landmarks, self.hr_detector, self.live_hr, self.br_detector, self.blink_detector, self.movement, self.timer, self.scheduler):
+            component.reset()
+        if self.subjects is not None:
+            self.subjects.reset()
+        self.emotion_samples = []
+        self.posture_samples = []
+        self.head_pose_samples = []
+        self.gaze_samples = []
+        self.movement_samples = []
+        self.au_samples = []
+        self.hr_samples = []
+        self.br_samples = []
+        self.blink_samples = []
+        
+    def begin_session(self, progress=None):
+        """Start a session; frames then go through process_frame() (collect/analyze_video do this themselves)"""
+        self.reset()
+        self._progress = progress
+        self._next_progress = 0.0
+        self._first_timestamp = None
+        self._elapsed = 0.0
+        self._frame_count = 0
+        self._last_blink = None
+        # Sampling is driven by capture time so dropped frames don't stretch the intervals
+        self._next_behavioral = self.sample_interval / self.fps
+        self._next_vital = self.vital_sample_interval / self.fps
+        self._absent = False
+    
+    def process_frame(self, frame, timestamp):
+        """Run every detector on one frame; returns the per-frame results, or None once duration is reached"""
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+        # Seconds since the first frame, from the capture clock rather than frame_count / fps
+        elapsed = timestamp - self._first_timestamp
+        if elapsed >= self.duration:
+            return None
+        self._elapsed = elapsed
+        self._frame_count += 1
+        frame_start = time.perf_counter()
+        timer = self.timer
+        
+        if self._absent and self._frame_count % self.presence_probe:
+            # Nobody in frame: skip inference (detectors record an absent frame) until the next probe
+            context = FrameContext(frame, timestamp=timestamp)
+        else:
+            with timer.stage('landmarks'):
+                context = self.landmarks.process(frame, timestamp)
+            self._absent = context.face_landmarks is None and context.pose_landmarks is None
+        
+        if self.subjects is not None:
+            with timer.stage('subjects'):
+                self.subjects.update(context)
+            # FaceMesh's face order isn't stable: the top-level traces follow the primary
+            # track, and take the body only when it isn't someone else's
+            context.face_landmarks = self.subjects.primary_face
+            if self.subjects.pose_owner not in (None, self.subjects.primary):
+                context.pose_landmarks = None
+        
+        behavioral_due = elapsed >= self._next_behavioral
+        self.scheduler.run(context, self._frame_count, ('behavioral',) if behavioral_due else ())
+        # Latest result of every stage: fresh for per-frame and due stages, possibly older for the overlay
+        latest = self.scheduler.latest
+        live_bpm = self.live_hr.current_bpm()
+        blink_result = latest['blink']
+        gaze_result = latest.get('gaze')
+        head_pose_result = latest.get('head_pose')
+        posture_result = latest.get('posture')
+        movement_result = latest['movement']
+        emotion_result = latest.get('emotion')
+        au_result = latest.get('facial_au')
+        self._last_blink = blink_result
+        
+        # Sample vital signs every 2 seconds
+        if elapsed >= self._next_vital:
+            self._next_vital += self.vital_sample_interval / self.fps
+            # HR from the streaming estimator (no batch recomputation in the loop)
+            hr_temp = live_bpm
+            if hr_temp:
+                self.hr_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'value': hr_temp
+                })
+            
+            # Calculate BR from the shoulder trace so far
+            with timer.stage('br_rolling'):
+                br_temp = self.br_detector.estimate(seconds=self.vital_sample_interval * 2 / self.fps)
+            if br_temp:
+                self.br_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'value': br_temp
+                })
+            
+            # Blink rate at this point
+            if blink_result:
+                self.blink_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'rate': blink_result['blink_rate'],
+                    'count': blink_result['blink_count']
+                })
+        
+        # Sample at intervals for rich data (the scheduler ran every behavioral detector on this frame)
+        if behavioral_due:
+            self._next_behavioral += self.sample_interval / self.fps
+            if emotion_result:
+                self.emotion_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'emotion': emotion_result['emotion'],
+                    'confidence': emotion_result['confidence']
+                })
+            if posture_result:
+                self.posture_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'status': posture_result['status'],
+                    'score': posture_result['score'],
+                    'shoulder_slope': posture_result['shoulder_slope'],
+                    'forward_lean': posture_result['forward_lean']
+                })
+            if head_pose_result:
+                self.head_pose_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'pitch': head_pose_result['pitch'],
+                    'yaw': head_pose_result['yaw'],
+                    'roll': head_pose_result['roll']
+                })
+            if gaze_result:
+                self.gaze_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'direction': gaze_result['direction'],
+                    'ratio': gaze_result['ratio']
+                })
+            if movement_result:
+                self.movement_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'fidget_level': movement_result['fidget_level'],
+                    'restlessness_score': movement_result['restlessness_score']
+                })
+            if au_result:
+                self.au_samples.append({
+                    'timestamp': round(elapsed, 3),
+                    'count': au_result['count'],
+                    'units': au_result['action_units']
+                })
+        
+        if self._progress is not None and elapsed >= self._next_progress:
+            self._next_progress = elapsed + self.progress_interval
+            self._publish('capturing', frames=self._frame_count, elapsed=round(elapsed, 2), duration=self.duration,
+                          face_detected=not self._absent, heart_rate=live_bpm,
+                          breathing_rate=self.br_detector.estimate())  # Whole trace so far
+        
+        timer.record('frame', time.perf_counter() - frame_start)
+        return {
+            'elapsed': elapsed,
+            'frames': self._frame_count,
+            'face_detected': not self._absent,
+            'live_bpm': live_bpm,
+            'blink_result': blink_result,
+            'gaze_result': gaze_result,
+            'head_pose_result': head_pose_result,
+            'posture_result': posture_result,
+            'movement_result': movement_result,
+            'emotion_result': emotion_result,
+            'au_result': au_result
+        }
+    
+    def _draw_overlay(self, frame, r):
+        """Draw the latest per-frame results onto the frame (called on the sink's thread)"""
+        y = 30
+        cv2.putText(frame, f"Recording: {r['elapsed']:.1f}s / {self.duration}s", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        y += 30
+        
+        # Show latest vital samples
+        if r['live_bpm']:
+            cv2.putText(frame, f"HR: {r['live_bpm']:.1f} BPM", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if self.br_samples:
+            cv2.putText(frame, f"BR: {self.br_samples[-1]['value']:.1f} BPM", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if r['blink_result']:
+            cv2.putText(frame, f"Blinks: {r['blink_result']['blink_count']} | Rate: {r['blink_result']['blink_rate']:.1f}/min", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if r['gaze_result']:
+            cv2.putText(frame, f"Gaze: {r['gaze_result']['direction']}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if r['head_pose_result']:
+            cv2.putText(frame, f"Head: P{r['head_pose_result']['pitch']:.0f} Y{r['head_pose_result']['yaw']:.0f} R{r['head_pose_result']['roll']:.0f}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if r['posture_result']:
+            color = (0, 255, 0) if r['posture_result']['status'] == 'GOOD' else (0, 0, 255)
+            cv2.putText(frame, f"Posture: {r['posture_result']['status']} ({r['posture_result']['score']}%)", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            y += 25
+        
+        if r['movement_result']:
+            cv2.putText(frame, f"Movement: {r['movement_result']['fidget_level']}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if r['emotion_result']:
+            cv2.putText(frame, f"Emotion: {r['emotion_result']['emotion']}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 25
+        
+        if r['au_result']:
+            cv2.putText(frame, f"Facial AUs: {r['au_result']['count']} active", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+    
+    def finish_session(self, wall_time, frames_read=None, frames_dropped=0, drop_policy='client'):
+        """Results of a session fed frame by frame (e.g. a network stream) since begin_session().
+        
+        wall_time: seconds the session took; frames_read / frames_dropped / drop_policy
+        describe what the caller's own ingestion received and rejected
+        """
+        frames_read = self._frame_count if frames_read is None else frames_read
+        results = self._finalize(self._elapsed, wall_time, frames_read, frames_dropped, drop_policy)
+        self._publish('done', results=results)
+        return results
+    
+    def _finalize(self, duration, wall_time, frames_read, frames_dropped, drop_policy):
+        """Final estimates over the session's traces plus aggregated samples, in the results schema"""
+        timer = self.timer
+        self._publish('analyzing', frames=self._frame_count)
+        # Session-level estimates are finalize-only scheduler stages
+        final = self.scheduler.finalize()
+        hr = final['hr_estimate']
+        br = final['br_estimate']
+        hrv_result = final['hrv']
+        blink_final = self._last_blink
+        
+        subjects = None
+        if self.subjects is not None:
+            with timer.stage('subject_results'):
+                subjects = self.subjects.results(origin=self._first_timestamp or 0.0, min_frames=self.fps)
         
         # Aggregate time-series data from samples
-        hr_summary = self._analyze_hr_samples(hr)
-        br_summary = self._analyze_br_samples(br)
-        blink_summary = self._analyze_blink_samples(blink_final)
-        posture_summary = self._analyze_posture_samples()
-        head_pose_summary = self._analyze_head_pose_samples()
-        gaze_summary = self._analyze_gaze_samples()
-        movement_summary = self._analyze_movement_samples()
-        emotion_summary = self._analyze_emotion_samples()
+        with timer.stage('aggregation'):
+            hr_summary = self._analyze_hr_samples(hr)
+            br_summary = self._analyze_br_samples(br)
+            blink_summary = self._analyze_blink_samples(blink_final)
+            posture_summary = self._analyze_posture_samples()
+            head_pose_summary = self._analyze_head_pose_samples()
+            gaze_summary = self._analyze_gaze_samples()
+            movement_summary = self._analyze_movement_samples()
+            emotion_summary = self._analyze_emotion_samples()
         
         results = {
             "session_summary": {
@@ -260,6 +487,7 @@ class LiveVitalsCollector:
             },
             "eye_attention": {
                 "blink_rate": blink_summary,
+                "blinks": final['blink_events'],  # Per-blink onsets/durations/amplitudes over the trace window
                 "gaze": gaze_summary
             },
             "posture_behavior": {
@@ -268,14 +496,21 @@ class LiveVitalsCollector:
                 "movement": movement_summary
             },
             "emotion": emotion_summary,
+            "subjects": subjects,  # Per-person results with their track_id (multi-subject mode only)
             "facial_action_units": {
                 "samples": self.au_samples,
                 "average_active": sum(s['count'] for s in self.au_samples) / len(self.au_samples) if self.au_samples else 0
             },
             "capture_info": {
-                "frames_captured": len(frames),
-                "duration_seconds": round(capture_time, 2),
+                "frames_captured": self._frame_count,
+                "duration_seconds": round(duration, 2),
                 "fps": self.fps,
+                "effective_fps": round(self._frame_count / wall_time, 1) if wall_time > 0 else 0,
+                "frames_read": frames_read,
+                "frames_dropped": frames_dropped,
+                "drop_policy": drop_policy,
+                "max_subjects": self.max_subjects,
+                "stage_timing": timer.summary(),
                 "behavioral_samples": len(self.emotion_samples),
                 "vital_samples": len(self.hr_samples),
                 "sample_intervals": {
@@ -293,26 +528,33 @@ class LiveVitalsCollector:
             }
         }
         
-        self._display_results(results)
-        
-        # Final cleanup
-        cv2.destroyAllWindows()
-        for _ in range(10):
-            cv2.waitKey(1)
-        
         return results
     
-    def _calculate_hrv(self, frames):
-        """Calculate HRV from all frames"""
-        if len(frames) < 150:
-            return {"status": "insufficient_data"}
-        
-        # Extract green channel values for HRV
-        green_values = []
-        for frame in frames:
-            roi = self.hr_detector.extract_face_roi(frame)
-            if roi is not None and roi.size > 200:
-                green_values.append(np.mean(roi[:, :, 1]))
+    def _publish(self, stage, **fields):
+        """Put a progress event on the session's queue, if it has one.
+        
+        Events are dicts with a 'stage' key:
+            'capturing'  every progress_interval seconds: frames, elapsed, duration,
+                         face_detected and the partial heart_rate / breathing_rate (None until known)
+            'analyzing'  capture is over, final estimates are being computed
+            'done'       results (None if the source couldn't be opened); always the last event
+        """
+        if self._progress is not None:
+            self._progress.put({'stage': stage, **fields})
+    
+    def _update_live_hr(self, context):
+        """Feed this frame's ROI mean (from the hr_roi stage) to the streaming estimator"""
+        self.live_hr.update(self.scheduler.latest['hr_roi'], context.timestamp)
+    
+    def close(self):
+        """Release the landmark graphs (and worker processes in 'process' execution mode)"""
+        self.landmarks.close()
+    
+    def _calculate_hrv(self):
+        """Calculate HRV from the session's RGB trace"""
+        # Green channel of every frame with a valid face ROI
+        green_values = self.hr_detector.trace.resampled(self.fps)[:, 1]
+        green_values = green_values[~np.isnan(green_values)]
         
         if len(green_values) < 150:
             return {"status": "insufficient_data"}
@@ -528,7 +770,7 @@ class LiveVitalsCollector:
             findings.append(f"Reduced blinking in {blink['low_blink_percentage']:.0f}% of samples - high concentration")
         
         # Posture
-        if posture.get('consistency_percentage', 0) < 50:
+        if posture.get('consistency_percentage', 100) < 50:
             findings.append(f"Inconsistent posture - only {posture['consistency_percentage']:.0f}% good posture")
         
         # Movement
@@ -718,43 +960,63 @@ class LiveVitalsCollector:
         
         pv = results['physiological_vitals']
         print("\n🫀 PHYSIOLOGICAL VITALS:")
-        print(f"  ❤️  Heart Rate: {pv['heart_rate']['average']} BPM (range: {pv['heart_rate']['min']}-{pv['heart_rate']['max']})")
-        print(f"     Trend: {pv['heart_rate']['trend']} | {pv['heart_rate']['interpretation']}")
+        # Summaries without enough data carry only a status, so every field is optional
+        hr, br = pv['heart_rate'], pv['breathing_rate']
+        print(f"  ❤️  Heart Rate: {hr.get('average', 'n/a')} BPM (range: {hr.get('min', 'n/a')}-{hr.get('max', 'n/a')})")
+        print(f"     Trend: {hr.get('trend', 'n/a')} | {hr.get('interpretation', hr.get('status', ''))}")
         print(f"     Samples: {len(self.hr_samples)} collected")
         
-        print(f"  🫁 Breathing Rate: {pv['breathing_rate']['average']} BPM (range: {pv['breathing_rate']['min']}-{pv['breathing_rate']['max']})")
-        print(f"     {pv['breathing_rate']['interpretation']}")
+        print(f"  🫁 Breathing Rate: {br.get('average', 'n/a')} BPM (range: {br.get('min', 'n/a')}-{br.get('max', 'n/a')})")
+        print(f"     {br.get('interpretation', br.get('status', ''))}")
         print(f"     Samples: {len(self.br_samples)} collected")
         
-        if pv['hrv']['status'] == 'calculated':
+        if pv['hrv'].get('status') == 'calculated':
             print(f"  💓 HRV: SDNN={pv['hrv']['sdnn']}ms, RMSSD={pv['hrv']['rmssd']}ms")
             print(f"     Stress Level: {pv['hrv']['stress_level'].upper()} | {pv['hrv']['interpretation']}")
         
         ea = results['eye_attention']
         print("\n👁️  EYE & ATTENTION:")
-        print(f"  👁️  Blink Rate: {ea['blink_rate']['average']}/min (range: {ea['blink_rate']['min']}-{ea['blink_rate']['max']})")
-        print(f"     {ea['blink_rate']['interpretation']}")
+        blink = ea['blink_rate']
+        print(f"  👁️  Blink Rate: {blink.get('average', 'n/a')}/min (range: {blink.get('min', 'n/a')}-{blink.get('max', 'n/a')})")
+        print(f"     {blink.get('interpretation', blink.get('status', ''))}")
         print(f"     Samples: {len(self.blink_samples)} collected")
-        print(f"  👀 Gaze Focus: {ea['gaze']['center_gaze_percentage']}% - {ea['gaze']['status']}")
+        if ea['blinks'] and ea['blinks']['count']:
+            print(f"     Blinks: {ea['blinks']['count']} | avg duration {ea['blinks']['mean_duration_ms']}ms | EAR drop {ea['blinks']['mean_amplitude']}")
+        gaze = ea['gaze']
+        print(f"  👀 Gaze Focus: {gaze.get('center_gaze_percentage', 'n/a')}% - {gaze.get('status', 'n/a')}")
         
         pb = results['posture_behavior']
+        posture, head_pose, movement = pb['posture'], pb['head_pose'], pb['movement']
         print("\n🧭 POSTURE & BEHAVIOR (Time-Series Analysis):")
-        print(f"  🧍 Posture: {pb['posture']['status'].upper()} (avg: {pb['posture']['average_score']}%, consistency: {pb['posture']['consistency_percentage']}%)")
-        print(f"     → {pb['posture']['recommendation']}")
-        print(f"  🧭 Head Pose: Pitch {pb['head_pose']['average_pitch']}° | Yaw {pb['head_pose']['average_yaw']}° | Roll {pb['head_pose']['average_roll']}°")
-        print(f"     → {pb['head_pose']['recommendation']}")
-        print(f"  🤸 Movement: {pb['movement']['status'].upper()} (restlessness: {pb['movement']['restlessness_percentage']}%)")
-        print(f"     → {pb['movement']['recommendation']}")
-        
-        print(f"\n😊 EMOTION: {results['emotion']['dominant_emotion']} ({results['emotion']['dominant_percentage']}% of {len(self.emotion_samples)} samples)")
-        print(f"   Distribution: {results['emotion']['emotion_distribution']}")
+        print(f"  🧍 Posture: {posture.get('status', 'n/a').upper()} (avg: {posture.get('average_score', 'n/a')}%, consistency: {posture.get('consistency_percentage', 'n/a')}%)")
+        print(f"     → {posture.get('recommendation', 'n/a')}")
+        print(f"  🧭 Head Pose: Pitch {head_pose.get('average_pitch', 'n/a')}° | Yaw {head_pose.get('average_yaw', 'n/a')}° | Roll {head_pose.get('average_roll', 'n/a')}°")
+        print(f"     → {head_pose.get('recommendation', 'n/a')}")
+        print(f"  🤸 Movement: {movement.get('status', 'n/a').upper()} (restlessness: {movement.get('restlessness_percentage', 'n/a')}%)")
+        print(f"     → {movement.get('recommendation', 'n/a')}")
+        
+        emotion = results['emotion']
+        print(f"\n😊 EMOTION: {emotion.get('dominant_emotion', 'n/a')} ({emotion.get('dominant_percentage', 'n/a')}% of {len(self.emotion_samples)} samples)")
+        print(f"   Distribution: {emotion.get('emotion_distribution', {})}")
         print(f"😀 FACIAL AUs: {results['facial_action_units']['average_active']:.1f} avg active")
         
+        if results['subjects']:
+            print(f"\n👥 SUBJECTS: {len(results['subjects'])} tracked")
+            for subject in results['subjects']:
+                blinks = subject['blinks']['count'] if subject['blinks'] else 0
+                print(f"   #{subject['track_id']}: HR {subject['heart_rate']['value']} BPM | BR {subject['breathing_rate']['value']} BPM | {blinks} blinks | {subject['frames_tracked']} frames")
+        
         print(f"\n📊 CAPTURE: {results['capture_info']['frames_captured']} frames")
         print(f"   Behavioral samples: {results['capture_info']['behavioral_samples']} (every 1s)")
         print(f"   Vital samples: {results['capture_info']['vital_samples']} (every 2s)")
+        print(f"   Effective FPS: {results['capture_info']['effective_fps']}")
+        # Slowest stages first
+        timing = sorted(results['capture_info']['stage_timing'].items(), key=lambda item: -item[1]['mean_ms'])
+        for name, t in timing[:5]:
+            print(f"   ⏱️  {name}: p50 {t['p50_ms']}ms | p95 {t['p95_ms']}ms | max {t['max_ms']}ms")
         print("="*70)
 
 if __name__ == "__main__":
     collector = LiveVitalsCollector(duration=10)
     results = collector.collect()
+    collector.close()
@@ -1,32 +1,29 @@
-import cv2
-import mediapipe as mp
 import numpy as np
+from .ring_buffer import RingBuffer
+
+# Shoulders, elbows and wrists
+UPPER_BODY = np.array([11, 12, 13, 14, 15, 16])
 
 class MovementDetector:
     def __init__(self):
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        self.prev_positions = []
-        self.movement_history = []
-    
-    def detect(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb_frame)
+        # The last 31 detected upper-body poses (30 frame-to-frame movements): shoulder,
+        # elbow and wrist (x, y) flattened to 12 columns
+        self.recent = RingBuffer(31, width=12)
         
-        if not results.pose_landmarks:
+    def reset(self):
+        self.recent.clear()
+    
+    def detect(self, context):
+        if context.pose_landmarks is None:
             return None
         
-        landmarks = results.pose_landmarks.landmark
-        current_positions = np.array([(landmarks[i].x, landmarks[i].y) for i in [11, 12, 13, 14, 15, 16]])
+        current_positions = context.pose_landmarks[UPPER_BODY, :2].astype(float).ravel()
+        self.recent.append(current_positions)
         
-        if len(self.prev_positions) > 0:
-            movement = np.mean(np.linalg.norm(current_positions - self.prev_positions, axis=1))
-            self.movement_history.append(movement)
-            
-            if len(self.movement_history) > 30:
-                self.movement_history.pop(0)
-            
-            avg_movement = np.mean(self.movement_history)
+        if len(self.recent) > 1:
+            # Mean joint displacement between consecutive detections, over the stack at once
+            positions = self.recent.latest().reshape(-1, len(UPPER_BODY), 2)
+            avg_movement = np.linalg.norm(np.diff(positions, axis=0), axis=2).mean(axis=1).mean()
             restlessness = min(100, int(avg_movement * 1000))
             
             if avg_movement < 0.01:
@@ -39,6 +36,4 @@ class MovementDetector:
             fidget_level = "LOW"
             restlessness = 0
         
-        self.prev_positions = current_positions
-        
         return {'fidget_level': fidget_level, 'restlessness_score': restlessness}
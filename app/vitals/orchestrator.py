@@ -0,0 +1,238 @@
+"""Run vitals sessions on several sources at once, one warm worker process per source.
+
+    python -m app.vitals.orchestrator 0 1 /dev/video2 clip.mp4 --duration 10
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+
+STATES = ('loading', 'ready', 'running', 'done', 'error', 'closed')
+
+def _is_file(source):
+    # Device paths (/dev/videoN) are character devices, not regular files
+    return isinstance(source, str) and os.path.isfile(source)
+
+def _source_worker(source_id, source, options, commands, events):
+    """Owns one source: loads the models once, then runs a session per 'run' command"""
+    from .live_collector import LiveVitalsCollector
+
+    frames = [0]
+    fps = options.get('fps', 30)
+
+    def on_timing(stage, seconds):
+        # One 'frame' record per analyzed frame: report progress about once a second
+        if stage == 'frame':
+            frames[0] += 1
+            if frames[0] % fps == 0:
+                events.put((source_id, 'progress', {'frames': frames[0]}))
+
+    def build(duration):
+        collector = LiveVitalsCollector(headless=True, timing_callback=on_timing, **dict(options, duration=duration))
+        collector.warm()  # The first session doesn't pay for model initialization
+        return collector
+
+    collector = None
+    try:
+        collector = build(options.get('duration', 10))
+        events.put((source_id, 'ready', None))
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            frames[0] = 0
+            if command['duration'] is not None and command['duration'] != collector.duration:
+                # Trace and timer buffers are sized from the duration at construction:
+                # a session of another length needs a collector built for it
+                collector.close()
+                collector = None
+                collector = build(command['duration'])
+            events.put((source_id, 'running', {'started': time.time(), 'duration': collector.duration}))
+            try:
+                if _is_file(source):
+                    results = collector.analyze_video(source)
+                else:
+                    results = collector.collect(source)
+                if results is None:
+                    events.put((source_id, 'error', f"Cannot open source: {source}"))
+                    continue
+                results["capture_info"]["source"] = str(source)
+                events.put((source_id, 'done', results))
+            except Exception as e:
+                events.put((source_id, 'error', f"{type(e).__name__}: {e}"))
+    except Exception as e:
+        events.put((source_id, 'error', f"{type(e).__name__}: {e}"))
+    finally:
+        if collector is not None:
+            collector.close()
+
+class VitalsOrchestrator:
+    """Start / status / result API over several camera indices, device paths or video files.
+
+    Every source gets its own worker process holding a warm LiveVitalsCollector
+    (headless, inline landmarks), so sessions on different cameras run in
+    parallel and back-to-back sessions on one camera skip model loading.
+    collector_options are passed to every LiveVitalsCollector (duration, fps,
+    crop, ...). Pass the usual session duration there: start() with another
+    duration rebuilds the source's collector, because its buffers are sized
+    for the duration it was built with.
+    """
+    def __init__(self, sources=None, **collector_options):
+        if collector_options.get('execution', 'inline') != 'inline':
+            # Source workers are daemonic, and daemonic processes can't start the extractor's workers
+            raise ValueError("VitalsOrchestrator runs landmarks inline in each source worker; execution='process' is not supported")
+        self.collector_options = collector_options
+        self._ctx = mp.get_context('spawn')  # MediaPipe graphs are not fork-safe
+        self._events = self._ctx.Queue()
+        self._workers = {}  # source_id -> {'source', 'process', 'commands', 'state', ...}
+        for source_id, source in dict(sources or {}).items():
+            self.add_source(source_id, source)
+
+    def add_source(self, source_id, source):
+        """Spawn the worker for `source` (camera index, device path or video file); models load right away"""
+        if source_id in self._workers:
+            raise ValueError(f"Source already registered: {source_id}")
+        commands = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_source_worker,
+            args=(source_id, source, self.collector_options, commands, self._events),
+            name=f"vitals-source-{source_id}",
+            daemon=True,
+        )
+        process.start()
+        self._workers[source_id] = {
+            'source': source, 'process': process, 'commands': commands, 'state': 'loading',
+            'frames': 0, 'started': None, 'duration': None, 'result': None, 'error': None, 'sessions': 0,
+        }
+        return source_id
+
+    def start(self, source_id, duration=None):
+        """Begin a session on one source (queued behind model loading if the worker is still warming up)"""
+        worker = self._worker(source_id)
+        self._drain()
+        if worker['state'] in ('running', 'closed'):
+            raise RuntimeError(f"Source {source_id} is {worker['state']}")
+        if worker['state'] == 'error' and not worker['process'].is_alive():
+            raise RuntimeError(f"Source {source_id} failed: {worker['error']}")
+        worker.update(state='running', result=None, error=None, frames=0, started=None)
+        worker['commands'].put({'duration': duration})
+
+    def start_all(self, duration=None):
+        for source_id in self._workers:
+            self.start(source_id, duration)
+
+    def status(self, source_id=None):
+        """State and progress of one source, or {source_id: status} for all of them"""
+        self._drain()
+        if source_id is not None:
+            return self._status(source_id, self._worker(source_id))
+        return {sid: self._status(sid, worker) for sid, worker in self._workers.items()}
+
+    def result(self, source_id, timeout=None):
+        """Block until the source's session finishes; returns its results dict"""
+        worker = self._worker(source_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._drain()
+        while worker['state'] in ('loading', 'ready', 'running') and worker['result'] is None:
+            if worker['state'] != 'running':
+                raise RuntimeError(f"No session started on source {source_id}")
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"Source {source_id} still running")
+            if not worker['process'].is_alive() and self._events.empty():
+                worker.update(state='error', error=f"Worker exited with code {worker['process'].exitcode}")
+                break
+            self._drain(timeout=min(remaining, 0.5) if remaining is not None else 0.5)
+        if worker['state'] == 'error':
+            raise RuntimeError(f"Source {source_id} failed: {worker['error']}")
+        return worker['result']
+
+    def results(self, timeout=None):
+        """Wait for every started source; returns {source_id: results}"""
+        return {sid: self.result(sid, timeout) for sid, worker in self._workers.items() if worker['sessions'] or worker['state'] == 'running'}
+
+    def close(self):
+        for worker in self._workers.values():
+            if worker['process'].is_alive():
+                worker['commands'].put(None)
+        for worker in self._workers.values():
+            worker['process'].join(timeout=10)
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+            worker['state'] = 'closed'
+
+    def _worker(self, source_id):
+        if source_id not in self._workers:
+            raise KeyError(f"Unknown source: {source_id}")
+        return self._workers[source_id]
+
+    def _status(self, source_id, worker):
+        status = {'source': worker['source'], 'state': worker['state'], 'frames': worker['frames'],
+                  'sessions': worker['sessions'], 'error': worker['error']}
+        if worker['state'] == 'running' and worker['started'] is not None:
+            status['elapsed'] = round(time.time() - worker['started'], 1)
+            status['duration'] = worker['duration']
+        return status
+
+    def _drain(self, timeout=0):
+        """Apply every pending worker event (waiting up to `timeout` for the first one)"""
+        block = timeout > 0
+        while True:
+            try:
+                source_id, kind, payload = self._events.get(block, timeout) if block else self._events.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            worker = self._workers[source_id]
+            if kind == 'ready':
+                # A start() issued while loading keeps the worker marked running
+                if worker['state'] == 'loading':
+                    worker['state'] = 'ready'
+            elif kind == 'running':
+                worker.update(state='running', started=payload['started'], duration=payload['duration'])
+            elif kind == 'progress':
+                worker['frames'] = payload['frames']
+            elif kind == 'done':
+                worker.update(state='done', result=payload, sessions=worker['sessions'] + 1,
+                              frames=payload['capture_info']['frames_captured'])
+            elif kind == 'error':
+                worker.update(state='error', error=payload)
+
+def _parse_source(text):
+    return int(text) if text.isdigit() else text
+
+def main():
+    parser = argparse.ArgumentParser(description="Run vitals sessions on several cameras / video files at once")
+    parser.add_argument('sources', nargs='+', help="Camera indices, device paths or video files")
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--crop', action='store_true', help="Face-tracked crop / downscaled inference")
+    parser.add_argument('--json', help="Write {source: results} to this file")
+    args = parser.parse_args()
+
+    orchestrator = VitalsOrchestrator({str(i): _parse_source(s) for i, s in enumerate(args.sources)},
+                                      duration=args.duration, fps=args.fps, crop=args.crop)
+    try:
+        orchestrator.start_all(args.duration)
+        while any(s['state'] in ('loading', 'running') for s in orchestrator.status().values()):
+            print(" | ".join(f"{s['source']}: {s['state']} {s['frames']}f" for s in orchestrator.status().values()))
+            time.sleep(1)
+        results = {}
+        for source_id, status in orchestrator.status().items():
+            if status['state'] == 'error':
+                print(f"❌ {status['source']}: {status['error']}")
+                continue
+            r = orchestrator.result(source_id)
+            results[str(status['source'])] = r
+            hr = r['physiological_vitals']['heart_rate']
+            print(f"✅ {status['source']}: HR {hr.get('final_value') or hr.get('value')} BPM | {r['capture_info']['frames_captured']} frames")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2, default=str)
+    finally:
+        orchestrator.close()
+
+if __name__ == "__main__":
+    main()
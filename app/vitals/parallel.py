@@ -0,0 +1,149 @@
+import multiprocessing as mp
+import queue
+from .frame_context import FrameContext, LandmarkExtractor
+from .frame_ring import FrameRing
+
+STAGES = ('face', 'pose')
+HOST = len(STAGES)  # Ring consumer slot of the process that submits frames (e.g. a FrameGrabber)
+
+def _landmark_worker(stage, consumer, ring_spec, results, crop=False, max_faces=1):
+    """Runs one landmark stage (FaceMesh or Pose) on frames read straight from the shared frame ring"""
+    ring = FrameRing(**ring_spec, create=False)
+    reader = ring.reader(consumer)
+    extractor = LandmarkExtractor(face=stage == 'face', pose=stage == 'pose', crop=crop, max_faces=max_faces)
+    try:
+        while True:
+            item = reader.next()
+            if item is None:
+                break
+            seq, frame, timestamp = item
+            context = extractor.process(frame)
+            landmarks = context.faces if stage == 'face' else context.pose_landmarks
+            results.put((seq, stage, landmarks))
+    finally:
+        extractor.close()
+        reader = None
+        ring.close()
+
+class ParallelLandmarkExtractor:
+    """Drop-in LandmarkExtractor that runs FaceMesh and Pose in two worker processes.
+
+    Frames are written once into a shared-memory FrameRing; each worker is a
+    ring consumer reading the slots in place and returns only landmarks, which
+    are joined by sequence number. A FrameGrabber given `ring` and `HOST` decodes
+    straight into the slots: submitting one of its views copies nothing, and
+    the workers start on each frame as soon as it is captured.
+    """
+    def __init__(self, max_pending=2, crop=False, max_faces=1):
+        self.max_pending = max_pending
+        self.crop = crop  # Workers run the face-tracked crop / downscaled mode of LandmarkExtractor
+        self.max_faces = max_faces
+        self._ctx = mp.get_context('spawn')  # MediaPipe graphs are not fork-safe
+        self._ring = None
+        self._workers = []
+        self._results = None
+        self._pending = {}  # seq -> {'frame', 'timestamp', 'face', 'pose'}
+
+    @property
+    def ring(self):
+        """The shared frame ring once start() has run, else None"""
+        return self._ring
+
+    def start(self, shape):
+        """Allocate a ring of `max_pending` frame slots of `shape` (h, w, 3) and spawn the workers.
+
+        No-op if already running at that shape; a new shape (another camera, a reused
+        extractor) tears the ring and workers down and starts them again.
+        """
+        shape = tuple(shape)
+        if self._ring is not None:
+            if self._ring.shape == shape:
+                return
+            if any('frame' in entry for entry in self._pending.values()):
+                raise ValueError(f"Frame shape {shape} does not match the frame ring {self._ring.shape} while frames are in flight")
+            self.close()
+        self._ring = FrameRing(shape, slots=self.max_pending, max_consumers=len(STAGES) + 1)
+        self._ring.register(HOST)
+        self._results = self._ctx.Queue()
+        for consumer, stage in enumerate(STAGES):
+            # Registered before spawning so no frame is written past a worker that is still loading
+            self._ring.register(consumer)
+            worker = self._ctx.Process(
+                target=_landmark_worker,
+                args=(stage, consumer, self._ring.spec, self._results, self.crop, self.max_faces),
+                name=f"vitals-{stage}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, frame, timestamp=None):
+        """Write a frame into the ring for both stages and return its sequence number"""
+        seq = self._ring.seq_of(frame) if self._ring is not None else None
+        if seq is not None:
+            # Already in the ring (a FrameGrabber view): the workers have it
+            self._pending.setdefault(seq, {}).update(frame=frame, timestamp=timestamp)
+            return seq
+        self.start(frame.shape)  # Reallocates the ring if the source changed resolution
+        # Blocks while both workers still hold the slot; landmarks keep flowing back meanwhile
+        while True:
+            try:
+                seq = self._ring.write(frame, timestamp, timeout=1.0)
+                break
+            except TimeoutError:
+                self._check_workers()
+        self._ring.release(HOST, seq)  # The caller keeps its own array
+        self._pending.setdefault(seq, {}).update(frame=frame, timestamp=timestamp)
+        return seq
+
+    @staticmethod
+    def _done(entry):
+        return all(stage in entry for stage in STAGES)
+
+    def _collect_one(self):
+        # Grabbed frames can finish before they are submitted
+        while True:
+            try:
+                seq, stage, landmarks = self._results.get(timeout=1.0)
+                break
+            except queue.Empty:
+                self._check_workers()
+        self._pending.setdefault(seq, {})[stage] = landmarks
+
+    def _check_workers(self):
+        """Raise if a worker died (OOM, MediaPipe abort): its results would never arrive"""
+        for worker in self._workers:
+            if not worker.is_alive():
+                raise RuntimeError(f"Landmark worker {worker.name} exited (exit code {worker.exitcode})")
+
+    def result(self, seq):
+        """Block until both stages have finished frame `seq`, then build its FrameContext"""
+        entry = self._pending[seq]
+        while not self._done(entry):
+            self._collect_one()
+        # Workers answer in order, so everything older belongs to grabbed frames that were never submitted
+        for old in [key for key in self._pending if key <= seq]:
+            del self._pending[old]
+        faces = entry['face']
+        return FrameContext(entry['frame'], None, faces[0] if faces else None, entry['pose'], entry['timestamp'], faces=faces)
+
+    def process(self, frame, timestamp=None):
+        return self.result(self.submit(frame, timestamp))
+        
+    def reset(self):
+        """Join any frames still in flight so a new session starts clean (workers stay warm)"""
+        for seq in sorted(seq for seq, entry in self._pending.items() if 'frame' in entry):
+            if seq in self._pending:
+                self.result(seq)
+        self._pending = {}  # Landmarks of grabbed frames the last session never submitted
+
+    def close(self):
+        if self._ring is not None:
+            self._ring.close_stream()
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        self._pending = {}
@@ -0,0 +1,96 @@
+"""Process-wide pool of warm LiveVitalsCollectors.
+
+Building a collector loads the FaceMesh/Pose graphs and the emotion cascade.
+That is seconds of work, and the result is identical for every session with the
+same options. Sessions borrow a collector, which reset() at session start, and
+give it back:
+
+    with collector_pool.borrow(duration=10, headless=True) as collector:
+        results = collector.collect()
+"""
+import threading
+from contextlib import contextmanager
+from .live_collector import LiveVitalsCollector
+
+class CollectorPool:
+    """Idle collectors keyed by their constructor options"""
+    def __init__(self, max_idle=2):
+        self.max_idle = max_idle  # Idle collectors kept per option set
+        self._idle = {}
+        self._warming = {}  # key -> Event set once a warm() for those options is done
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _key(options):
+        return tuple(sorted(options.items(), key=lambda item: item[0]))
+
+    def acquire(self, **options):
+        """A warm collector built with `options` (a new one if none is idle)"""
+        key = self._key(options)
+        warming = self._warming.get(key)
+        if warming is not None:
+            warming.wait()  # Cheaper to wait for the collector already being built than to build another
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+            self.created += 1
+        return LiveVitalsCollector(**options)
+
+    def release(self, collector, **options):
+        """Return a collector borrowed with the same `options`; closed instead if the pool is full"""
+        key = self._key(options)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(collector)
+                return
+        collector.close()
+
+    @contextmanager
+    def borrow(self, **options):
+        collector = self.acquire(**options)
+        try:
+            yield collector
+        except BaseException:
+            collector.close()  # State after a failed session is unknown: don't hand it out again
+            raise
+        else:
+            self.release(collector, **options)
+
+    def warm(self, count=1, **options):
+        """Pre-build `count` collectors so even the first session starts warm"""
+        key = self._key(options)
+        with self._lock:
+            if key in self._warming:
+                return
+            done = self._warming[key] = threading.Event()
+        try:
+            with self._lock:
+                missing = count - len(self._idle.get(key, []))
+                self.created += max(missing, 0)
+            for _ in range(missing):
+                collector = LiveVitalsCollector(**options)
+                collector.warm()
+                self.release(collector, **options)
+        finally:
+            del self._warming[key]
+            done.set()
+
+    def warm_async(self, count=1, **options):
+        """warm() on a background thread (e.g. at app startup)"""
+        thread = threading.Thread(target=self.warm, args=(count,), kwargs=options, name="vitals-pool-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for collectors in idle.values():
+            for collector in collectors:
+                collector.close()
+
+collector_pool = CollectorPool()
@@ -1,15 +0,0 @@
-import cv2
-import mediapipe as mp
-
-class PoseExtractor:
-    def __init__(self):
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        
-    def extract(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb)
-        return results.pose_landmarks if results.pose_landmarks else None
-    
-    def __del__(self):
-        self.pose.close()
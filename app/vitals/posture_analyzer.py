@@ -1,29 +1,17 @@
-import cv2
-import mediapipe as mp
 import numpy as np
 
+POSTURE_POINTS = np.array([11, 12, 0])
+
 class PostureAnalyzer:
-    def __init__(self):
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-    
-    def analyze(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb_frame)
-        
-        if not results.pose_landmarks:
+    def analyze(self, context):
+        if context.pose_landmarks is None:
             return None
         
-        landmarks = results.pose_landmarks.landmark
-        
-        left_shoulder = landmarks[11]
-        right_shoulder = landmarks[12]
-        left_hip = landmarks[23]
-        right_hip = landmarks[23]
-        nose = landmarks[0]
+        # y of left shoulder, right shoulder and nose
+        left_shoulder_y, right_shoulder_y, nose_y = context.pose_landmarks[POSTURE_POINTS, 1].tolist()
         
-        shoulder_slope = abs(left_shoulder.y - right_shoulder.y)
-        forward_lean = abs(nose.y - (left_shoulder.y + right_shoulder.y) / 2)
+        shoulder_slope = abs(left_shoulder_y - right_shoulder_y)
+        forward_lean = abs(nose_y - (left_shoulder_y + right_shoulder_y) / 2)
         
         score = 100
         if shoulder_slope > 0.08:  # More lenient (was 0.05)
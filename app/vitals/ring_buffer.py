@@ -0,0 +1,71 @@
+import numpy as np
+from .dsp import resample_uniform
+
+class RingBuffer:
+    """Fixed-capacity array that keeps the most recent rows"""
+    def __init__(self, capacity, width=1, dtype=np.float64):
+        self.capacity = int(capacity)
+        self.width = width
+        self.data = np.full((self.capacity, width), np.nan, dtype=dtype)
+        self.count = 0  # Total rows ever appended
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, row):
+        self.data[self.count % self.capacity] = row
+        self.count += 1
+
+    def latest(self, n=None):
+        """Most recent n rows (all stored rows by default), oldest first"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        if n == 0:
+            return self.data[:0].copy()
+        end = self.count % self.capacity
+        start = end - n
+        if start >= 0:
+            return self.data[start:end].copy()
+        return np.concatenate([self.data[start:], self.data[:end]])
+
+    def clear(self):
+        self.data.fill(np.nan)
+        self.count = 0
+
+class TimedTrace:
+    """RingBuffer of per-frame values paired with their capture timestamps"""
+    def __init__(self, capacity, width=1):
+        self.times = RingBuffer(capacity)
+        self.values = RingBuffer(capacity, width=width)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def count(self):
+        return self.values.count
+
+    def append(self, timestamp, row):
+        self.times.append(timestamp)
+        self.values.append(row)
+
+    def latest(self, n=None):
+        return self.values.latest(n)
+
+    def window(self, seconds=None):
+        """(times, values) captured within the last `seconds` (everything by default)"""
+        times, values = self.times.latest()[:, 0], self.values.latest()
+        if seconds is not None and len(times):
+            keep = times > times[-1] - seconds
+            times, values = times[keep], values[keep]
+        return times, values
+
+    def resampled(self, fps, seconds=None):
+        """Window resampled onto a uniform fps grid using the real capture times"""
+        times, values = self.window(seconds)
+        out = resample_uniform(times, values, fps)
+        return out[:, 0] if self.values.width == 1 else out
+
+    def clear(self):
+        self.times.clear()
+        self.values.clear()
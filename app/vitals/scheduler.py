@@ -0,0 +1,52 @@
+from .timing import StageTimer
+
+FINALIZE = None  # Cadence for stages that only run when the session is finalized
+
+class DetectorScheduler:
+    """Runs each detector stage only on the frames whose output is actually used
+
+    A stage declares:
+        every  - run every N frames (1 = every frame, 0 = only on demand,
+                 FINALIZE = only in finalize())
+        on     - demand tags (e.g. 'behavioral') that force a run this frame
+        needs  - 'face' / 'pose' presence gate: skipped (result None) when the
+                 frame has no such landmarks
+    Stateful detectors (traces, blink counting) must use every=1 and no gate so
+    absent frames are still recorded.
+    """
+    def __init__(self, timer=None):
+        self.timer = timer if timer is not None else StageTimer()
+        self.stages = []
+        self.latest = {}  # Most recent result per stage (for overlays between runs)
+
+    def add(self, name, fn, every=1, on=(), needs=None):
+        self.stages.append((name, fn, every, frozenset(on), needs))
+        return self
+
+    def reset(self):
+        self.latest = {}
+
+    def run(self, context, frame_index, demand=()):
+        """Run the stages due on this frame; returns {name: result} for the stages that ran"""
+        results = {}
+        for name, fn, every, on, needs in self.stages:
+            if every is FINALIZE:
+                continue
+            if not ((every and frame_index % every == 0) or (on and not on.isdisjoint(demand))):
+                continue
+            if (needs == 'face' and context.face_landmarks is None) or (needs == 'pose' and context.pose_landmarks is None):
+                result = None
+            else:
+                with self.timer.stage(name):
+                    result = fn(context)
+            results[name] = self.latest[name] = result
+        return results
+
+    def finalize(self):
+        """Run the finalize-only stages; returns {name: result}"""
+        results = {}
+        for name, fn, every, on, needs in self.stages:
+            if every is FINALIZE:
+                with self.timer.stage(name):
+                    results[name] = self.latest[name] = fn()
+        return results
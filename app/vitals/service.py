@@ -0,0 +1,386 @@
+"""Headless vitals ingestion service: clients stream frames, the service runs the pipeline.
+
+    python -m app.vitals.service --port 8765
+
+    POST   /sessions                 {"duration": 30, "fps": 30}  -> 201 {"session_id": ...}
+                                     (400 unless 0 < duration <= MAX_DURATION, 0 < fps <= MAX_FPS)
+    POST   /sessions/<id>/frames     JPEG/PNG body (image/jpeg, image/png) or raw BGR24
+                                     (application/octet-stream + X-Width / X-Height),
+                                     optional X-Timestamp (capture time, seconds; defaults
+                                     to the request's arrival time)
+                                     -> 202 {"frame": n}, or 429 + Retry-After when the
+                                     session's queue is full (backpressure); 413 above
+                                     MAX_IMAGE_BYTES / MAX_FRAME_PIXELS
+    GET    /sessions/<id>            latest partial HR / BR / blink estimates
+    GET    /sessions/<id>/events     Server-Sent Events: 'partial' about once a second, then 'result'
+    POST   /sessions/<id>/finish     -> full results (same schema as LiveVitalsCollector)
+    DELETE /sessions/<id>
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+from .web_collector import WebVitalsCollector
+
+MAX_DURATION = 3600  # Seconds per session
+MAX_FPS = 120
+MAX_FRAME_PIXELS = 3840 * 2160  # Raw and decoded frames up to 4K
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # Encoded JPEG/PNG frame bodies
+MAX_JSON_BYTES = 64 * 1024  # Every other request body
+
+class StreamSession:
+    """One client's stream: a bounded frame queue drained by a dedicated analysis thread"""
+    def __init__(self, session_id, duration=60, fps=30, max_queue=8, **collector_options):
+        self.session_id = session_id
+        self.collector = WebVitalsCollector(duration=duration, fps=fps, rgb_input=False, **collector_options)
+        self.frames = queue.Queue(max_queue)
+        self.result = None
+        self.error = None
+        self.finished = threading.Event()
+        self.last_active = time.monotonic()
+        self.submitted = 0
+        self._subscribers = []
+        self._closed = False  # The end of the event stream has been published
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"vitals-session-{session_id}", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, timestamp=None):
+        """Queue a decoded BGR frame; False when the queue is full (the client should back off)"""
+        self.last_active = time.monotonic()
+        if timestamp is None:
+            timestamp = self.last_active  # Arrival time: queueing delay must not shift the frame's timing
+        if self.finished.is_set() or self.collector.done:
+            return False
+        try:
+            self.frames.put_nowait((frame, timestamp))
+        except queue.Full:
+            self.collector.frames_dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def _run(self):
+        last = None
+        try:
+            while True:
+                item = self.frames.get()
+                if item is None:
+                    break
+                partial = self.collector.process_frame(*item)
+                if partial is not None and partial is not last:
+                    last = partial
+                    self._publish('partial', partial)
+                if self.collector.done:
+                    break
+            self.result = self.collector.finish()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.collector.close()
+            self._publish('result', self.result if self.error is None else {'error': self.error})
+            self._publish(None, None)
+            self.finished.set()
+
+    def finish(self, timeout=None):
+        """Analyze whatever is still queued, then finalize; returns the results"""
+        while not self.finished.is_set():
+            try:
+                self.frames.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue  # The analysis thread may already have stopped at the duration limit
+        self.finished.wait(timeout)
+        return self.result
+
+    def subscribe(self):
+        """Queue of (event, data) pairs for one listener; (None, None) marks the end"""
+        listener = queue.Queue()
+        with self._lock:
+            if self._closed:
+                listener.put(('result', self.result if self.error is None else {'error': self.error}))
+                listener.put((None, None))
+            else:
+                self._subscribers.append(listener)
+                if self.collector.partial() is not None:
+                    listener.put(('partial', self.collector.partial()))
+        return listener
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self._subscribers:
+                self._subscribers.remove(listener)
+
+    def _publish(self, event, data):
+        with self._lock:
+            for listener in self._subscribers:
+                listener.put((event, data))
+            if event is None:
+                self._subscribers = []
+                self._closed = True
+
+class VitalsService:
+    """Session registry shared by the HTTP handler threads"""
+    def __init__(self, max_sessions=8, idle_timeout=60, max_queue=8, reap_interval=5, **collector_options):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout  # Seconds without frames before a session is finalized and dropped
+        self.max_queue = max_queue
+        self.collector_options = collector_options
+        self.sessions = {}
+        self._lock = threading.Lock()
+        # Abandoned sessions are reaped on a timer, not only when a new session is created
+        self._stop = threading.Event()
+        self._reaper = threading.Thread(target=self._reap_loop, args=(reap_interval,), name="vitals-session-reaper", daemon=True)
+        self._reaper.start()
+
+    def create(self, duration=60, fps=30):
+        self.reap()
+        with self._lock:
+            active = sum(1 for s in self.sessions.values() if not s.finished.is_set())
+            if active >= self.max_sessions:
+                return None
+            session_id = uuid.uuid4().hex[:12]
+            self.sessions[session_id] = StreamSession(session_id, duration, fps, self.max_queue, **self.collector_options)
+        return session_id
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def remove(self, session_id):
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is not None:
+            session.finish()
+        return session is not None
+
+    def _reap_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"⚠️ Session reaper: {type(e).__name__}: {e}")
+
+    def reap(self):
+        """Finalize sessions idle for longer than idle_timeout"""
+        now = time.monotonic()
+        for session_id, session in list(self.sessions.items()):
+            if now - session.last_active > self.idle_timeout:
+                self.remove(session_id)
+
+    def close(self):
+        self._stop.set()
+        for session_id in list(self.sessions):
+            self.remove(session_id)
+
+def decode_frame(body, content_type, headers):
+    """Request body -> BGR frame, or None if it can't be decoded"""
+    if content_type in ('image/jpeg', 'image/png'):
+        return cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if content_type == 'application/octet-stream':
+        width, height = int(headers.get('X-Width', 0)), int(headers.get('X-Height', 0))
+        if not width or not height or len(body) != width * height * 3:
+            return None
+        return np.frombuffer(body, dtype=np.uint8).reshape(height, width, 3)
+    return None
+
+class VitalsRequestHandler(BaseHTTPRequestHandler):
+    service = None  # Set by make_server
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Per-frame request logs would swamp the console
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self, limit=MAX_JSON_BYTES):
+        """Request body, or None after answering 400/413 for a bad or oversized Content-Length"""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > limit:
+            self.close_connection = True  # The unread body can't be skipped reliably
+            if length < 0:
+                self._send_json(400, {'error': 'invalid Content-Length'})
+            else:
+                self._send_json(413, {'error': f"body of {length} bytes exceeds the {limit} byte limit"})
+            return None
+        return self.rfile.read(length) if length else b''
+
+    def _frame_limit(self):
+        """Largest acceptable frame body for this request's headers, or None after answering 400/413"""
+        if self.headers.get('Content-Type', '').split(';')[0] != 'application/octet-stream':
+            return MAX_IMAGE_BYTES
+        try:
+            width, height = int(self.headers.get('X-Width', 0)), int(self.headers.get('X-Height', 0))
+        except ValueError:
+            width = height = 0
+        if width <= 0 or height <= 0:
+            self.close_connection = True
+            self._send_json(400, {'error': 'raw frames need positive X-Width and X-Height'})
+            return None
+        if width * height > MAX_FRAME_PIXELS:
+            self.close_connection = True
+            self._send_json(413, {'error': f"{width}x{height} exceeds {MAX_FRAME_PIXELS} pixels"})
+            return None
+        return width * height * 3
+
+    def _route(self):
+        """(/sessions/<id>/<action>) -> (session, action); sends 404 and returns None if unknown"""
+        parts = self.path.split('?')[0].strip('/').split('/')
+        if parts[0] != 'sessions' or len(parts) < 2:
+            self._send_json(404, {'error': 'not found'})
+            return None
+        session = self.service.get(parts[1])
+        if session is None:
+            self._send_json(404, {'error': f"unknown session {parts[1]}"})
+            return None
+        return session, (parts[2] if len(parts) > 2 else '')
+
+    def do_POST(self):
+        if self.path.rstrip('/') == '/sessions':
+            body = self._read_body()
+            if body is None:
+                return
+            try:
+                options = json.loads(body) if body else {}
+                duration, fps = float(options.get('duration', 60)), int(options.get('fps', 30))
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send_json(400, {'error': f"invalid session options: {e}"})
+                return
+            # Checked here: a bad value would otherwise fail inside the session's analysis thread
+            if not 0 < duration <= MAX_DURATION or not 0 < fps <= MAX_FPS:
+                self._send_json(400, {'error': f"duration must be in (0, {MAX_DURATION}] seconds and fps in (0, {MAX_FPS}]"})
+                return
+            session_id = self.service.create(duration=duration, fps=fps)
+            if session_id is None:
+                self._send_json(503, {'error': 'too many sessions'}, {'Retry-After': '5'})
+            else:
+                self._send_json(201, {'session_id': session_id})
+            return
+
+        limit = self._frame_limit() if self.path.rstrip('/').endswith('/frames') else MAX_JSON_BYTES
+        body = self._read_body(limit) if limit is not None else None
+        if body is None:
+            return
+        route = self._route()
+        if route is None:
+            return
+        session, action = route
+        if action == 'frames':
+            frame = decode_frame(body, self.headers.get('Content-Type', '').split(';')[0], self.headers)
+            if frame is None:
+                self._send_json(400, {'error': 'could not decode frame'})
+                return
+            if frame.shape[0] * frame.shape[1] > MAX_FRAME_PIXELS:
+                self._send_json(413, {'error': f"{frame.shape[1]}x{frame.shape[0]} exceeds {MAX_FRAME_PIXELS} pixels"})
+                return
+            timestamp = self.headers.get('X-Timestamp')
+            try:
+                timestamp = float(timestamp) if timestamp else None
+            except ValueError:
+                self._send_json(400, {'error': 'invalid X-Timestamp'})
+                return
+            if not session.submit(frame, timestamp):
+                if session.collector.done or session.finished.is_set():
+                    self._send_json(409, {'error': 'session finished'})
+                else:
+                    self._send_json(429, {'error': 'analysis queue full'}, {'Retry-After': '0.1'})
+                return
+            self._send_json(202, {'frame': session.submitted})
+        elif action == 'finish':
+            results = session.finish()
+            self._send_json(200 if session.error is None else 500, results if session.error is None else {'error': session.error})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_GET(self):
+        route = self._route()
+        if route is None:
+            return
+        session, action = route
+        if action == '':
+            self._send_json(200, {'partial': session.collector.partial(), 'finished': session.finished.is_set(),
+                                  'queued': session.frames.qsize(), 'rejected': session.collector.frames_dropped})
+        elif action == 'events':
+            self._stream_events(session)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_DELETE(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'sessions' and self.service.remove(parts[1]):
+            self._send_json(200, {'deleted': parts[1]})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def _stream_events(self, session):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        listener = session.subscribe()
+        try:
+            while True:
+                try:
+                    event, data = listener.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')  # Keeps proxies from closing an idle stream
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            session.unsubscribe(listener)
+
+def make_server(host='127.0.0.1', port=8765, **service_options):
+    """ThreadingHTTPServer bound to a new VitalsService (server.service)"""
+    service = VitalsService(**service_options)
+    handler = type('BoundVitalsRequestHandler', (VitalsRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless vitals ingestion service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-sessions', type=int, default=8)
+    parser.add_argument('--max-queue', type=int, default=8, help="Frames buffered per session before 429")
+    parser.add_argument('--crop', action='store_true', help="Face-tracked crop / downscaled inference")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, max_sessions=args.max_sessions, max_queue=args.max_queue, crop=args.crop)
+    print(f"🩺 Vitals service on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.service.close()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
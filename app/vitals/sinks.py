@@ -0,0 +1,219 @@
+"""Where analyzed frames go: an on-screen window, a video file, or nowhere.
+
+Sinks render on their own thread at their own rate, so drawing, imshow/waitKey
+and encoding never run in the analysis loop. The loop only hands over the frame
+and its per-frame results; a sink with wants_frames=False isn't even called.
+The exception is WindowSink on macOS, where HighGUI only works on the thread
+that drives the window: there it renders in submit(), still rate-limited.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+import cv2
+
+class FrameSink:
+    """Base sink: start(), submit(frame, results), close(); `stopped` once the user asked to stop"""
+    wants_frames = True
+
+    def __init__(self):
+        self.stopped = False
+
+    def start(self, render=None):
+        """render(frame, results) draws the overlay; it runs on the sink's thread"""
+        self.render = render
+        self.stopped = False  # A new session: a previous 'q' no longer applies
+        return self
+
+    def submit(self, frame, results):
+        pass
+
+    def close(self):
+        pass
+
+class NullSink(FrameSink):
+    """Headless: no overlay, no window, no per-frame work at all"""
+    wants_frames = False
+
+class _ThreadedSink(FrameSink):
+    """Hands frames to a worker thread through a small deque (oldest frames dropped when it falls behind).
+
+    threaded=False renders and emits in submit() on the calling thread instead.
+    """
+    def __init__(self, max_queue=1, max_fps=None, threaded=True):
+        super().__init__()
+        self.max_fps = max_fps  # Cap on frames rendered per second (None = every frame it gets to)
+        self.threaded = threaded
+        self.frames_dropped = 0
+        self._queue = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self, render=None):
+        super().start(render)
+        self._next_time = 0.0
+        if not self.threaded:
+            self._open()
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"vitals-{type(self).__name__}", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, frame, results):
+        if not self.threaded:
+            if not self._handle(frame, results):
+                self.frames_dropped += 1
+                self._idle()
+            return
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.frames_dropped += 1
+            self._queue.append((frame, results))
+            self._cond.notify()
+
+    def _handle(self, frame, results):
+        """Render and emit one frame unless it comes sooner than max_fps allows; False if skipped"""
+        now = time.monotonic()
+        if now < self._next_time:
+            return False
+        self._next_time = now + (1.0 / self.max_fps if self.max_fps else 0)
+        if self.render is not None:
+            self.render(frame, results)
+        self._emit(frame)
+        return True
+
+    def _run(self):
+        try:
+            self._open()
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._queue or not self._running, timeout=0.05)
+                    if not self._queue:
+                        if not self._running:
+                            break
+                        self._idle()
+                        continue
+                    frame, results = self._queue.popleft()
+                self._handle(frame, results)
+        finally:
+            self._release()
+
+    def _open(self):
+        pass
+
+    def _idle(self):
+        pass
+
+    def _emit(self, frame):
+        raise NotImplementedError
+
+    def _release(self):
+        pass
+
+    def close(self):
+        if not self.threaded:
+            self._release()
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+class WindowSink(_ThreadedSink):
+    """Shows the annotated frames in an OpenCV window; pressing 'q' sets `stopped`.
+
+    All HighGUI calls stay on one thread: the sink's own on Linux/Windows, the
+    caller's on macOS (GUI calls there must come from the main thread).
+    threaded overrides the platform default.
+    """
+    def __init__(self, title='Vitals Collection', max_fps=30, threaded=None):
+        if threaded is None:
+            threaded = sys.platform != 'darwin'
+        super().__init__(max_queue=1, max_fps=max_fps, threaded=threaded)
+        self.title = title
+
+    def _emit(self, frame):
+        cv2.imshow(self.title, frame)
+        self._poll()
+
+    def _idle(self):
+        self._poll()  # Keep the window responsive between frames
+
+    def _poll(self):
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self.stopped = True
+
+    def _release(self):
+        cv2.destroyWindow(self.title)
+        cv2.waitKey(1)
+
+class RecorderSink(_ThreadedSink):
+    """Encodes the annotated frames to a video file in the background.
+
+    Frames are placed by their capture time (results['elapsed']). Gaps left by
+    dropped frames repeat the previous frame, and frames arriving faster than
+    `fps` are skipped, so the file plays in real time. Each session gets its own
+    file: `path` first, then name-2.ext, name-3.ext, ... (see `paths`).
+    """
+    def __init__(self, path, fps=30, fourcc='MJPG', max_queue=64):
+        super().__init__(max_queue=max_queue)
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.paths = []  # One file per session, in order
+        self.frames_written = 0  # In the current session's file
+        self._writer = None
+
+    def start(self, render=None):
+        root, ext = os.path.splitext(self.path)
+        self.paths.append(self.path if not self.paths else f"{root}-{len(self.paths) + 1}{ext}")
+        self.frames_written = 0
+        self._origin = None  # Capture time of the session's first frame
+        self._last = None
+        return super().start(render)
+
+    def _handle(self, frame, results):
+        timestamp = results.get('elapsed') if results else None
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self._origin is None:
+            self._origin = timestamp
+        # Frames the file should hold up to and including this one
+        due = int(round((timestamp - self._origin) * self.fps)) + 1
+        if due <= self.frames_written:
+            return False  # Its slot at `fps` is already filled
+        if self.render is not None:
+            self.render(frame, results)
+        while self._last is not None and self.frames_written < due - 1:
+            self._emit(self._last)
+        self._emit(frame)
+        self._last = frame
+        return True
+
+    def _emit(self, frame):
+        if self._writer is None:
+            h, w = frame.shape[:2]
+            self._writer = cv2.VideoWriter(self.paths[-1], cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+        self._writer.write(frame)
+        self.frames_written += 1
+
+    def _release(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        self._last = None
+
+def make_sink(kind, **options):
+    """'window' | 'record' (path=...) | 'none'"""
+    if kind == 'window':
+        return WindowSink(**options)
+    if kind == 'record':
+        return RecorderSink(**options)
+    if kind == 'none':
+        return NullSink()
+    raise ValueError(f"Unknown sink: {kind} (expected 'window', 'record' or 'none')")
@@ -0,0 +1,228 @@
+"""On-disk session store: SQLite metadata + one compressed columnar .npz per session.
+
+    store = SessionStore()                      # ~/.pixelcare (or $PIXELCARE_DATA)
+    session_id = store.save(results, user_id="alice")
+    store.sessions("alice", start=time.time() - 30 * 86400)
+    times, hr = store.trend("alice", "heart_rate")
+    store.baseline("alice")                     # rolling mean/std over the last sessions
+    store.load_series(session_id, ["heart_rate"])
+
+Headline metrics are SQLite columns indexed by (user_id, started_at), so trends
+and range queries never open a session's series. Every sample list found in the
+results (HR/BR/blink/posture/head pose/movement/AU samples) is stored as
+columns: numbers as float32, labels as strings.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import numpy as np
+
+# Metric column -> path into the results schema (first non-None value wins)
+METRICS = {
+    'heart_rate': [('physiological_vitals', 'heart_rate', 'final_value'), ('physiological_vitals', 'heart_rate', 'value')],
+    'breathing_rate': [('physiological_vitals', 'breathing_rate', 'final_value'), ('physiological_vitals', 'breathing_rate', 'value')],
+    'hrv_sdnn': [('physiological_vitals', 'hrv', 'sdnn')],
+    'hrv_rmssd': [('physiological_vitals', 'hrv', 'rmssd')],
+    'blink_rate': [('eye_attention', 'blink_rate', 'average'), ('eye_attention', 'blink_rate', 'value')],
+    'posture_score': [('posture_behavior', 'posture', 'average_score')],
+    'health_score': [('session_summary', 'overall_health_status', 'score')],
+}
+
+def default_root():
+    return os.environ.get('PIXELCARE_DATA', os.path.join(os.path.expanduser('~'), '.pixelcare'))
+
+def _lookup(results, paths):
+    for path in paths:
+        value = results
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return None
+
+def split_series(results):
+    """(summary without sample lists, {series name: list of sample dicts})"""
+    series = {}
+
+    def strip(node):
+        if not isinstance(node, dict):
+            return node
+        out = {}
+        for key, value in node.items():
+            if isinstance(value, dict):
+                samples = value.get('samples')
+                if isinstance(samples, list) and samples and isinstance(samples[0], dict):
+                    series[key] = samples
+                    value = {k: v for k, v in value.items() if k != 'samples'}
+                value = strip(value)
+            out[key] = value
+        return out
+
+    return strip(results), series
+
+def to_columns(samples):
+    """List of sample dicts -> {column: array}; nested values are kept as JSON strings"""
+    keys = list(dict.fromkeys(key for sample in samples for key in sample))
+    columns = {}
+    for key in keys:
+        values = [sample.get(key) for sample in samples]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            columns[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float32)
+        elif present and all(isinstance(v, str) for v in present):
+            columns[key] = np.array(['' if v is None else v for v in values])
+        else:
+            columns[key] = np.array([json.dumps(v, default=str) for v in values])
+    return columns
+
+class SessionStore:
+    """Indexed history of vitals sessions for many users"""
+    def __init__(self, root=None, baseline_window=20):
+        self.root = root or default_root()
+        self.baseline_window = baseline_window  # Sessions in each user's rolling baseline
+        os.makedirs(os.path.join(self.root, 'series'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, 'sessions.db'), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        metric_columns = ''.join(f", {name} REAL" for name in METRICS)
+        with self._db:
+            self._db.execute(f"""CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, started_at REAL NOT NULL,
+                duration REAL, frames INTEGER, series_path TEXT, summary TEXT{metric_columns})""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_user_time ON sessions (user_id, started_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_time ON sessions (started_at)")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS baselines (
+                user_id TEXT NOT NULL, metric TEXT NOT NULL, n INTEGER, mean REAL, std REAL, updated_at REAL,
+                PRIMARY KEY (user_id, metric))""")
+
+    def save(self, results, user_id='default', started_at=None):
+        """Store one session's results; returns its session_id"""
+        session_id = uuid.uuid4().hex
+        capture = results.get('capture_info', {})
+        duration = capture.get('duration_seconds')
+        if started_at is None:
+            started_at = time.time() - (duration or 0)
+        summary, series = split_series(results)
+
+        series_path = None
+        if series:
+            user_dir = os.path.join(self.root, 'series', _safe(user_id))
+            os.makedirs(user_dir, exist_ok=True)
+            series_path = os.path.join(user_dir, f"{session_id}.npz")
+            arrays = {f"{name}.{column}": values for name, samples in series.items()
+                      for column, values in to_columns(samples).items()}
+            np.savez_compressed(series_path, **arrays)
+
+        metrics = {name: _lookup(results, paths) for name, paths in METRICS.items()}
+        columns = ['session_id', 'user_id', 'started_at', 'duration', 'frames', 'series_path', 'summary'] + list(metrics)
+        values = [session_id, user_id, started_at, duration, capture.get('frames_captured'), series_path,
+                  json.dumps(summary, default=str)] + list(metrics.values())
+        with self._lock, self._db:
+            self._db.execute(f"INSERT INTO sessions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+            self._update_baseline(user_id)
+        return session_id
+
+    def _update_baseline(self, user_id):
+        rows = self._db.execute(f"SELECT {', '.join(METRICS)} FROM sessions WHERE user_id = ? ORDER BY started_at DESC LIMIT ?",
+                                (user_id, self.baseline_window)).fetchall()
+        values = np.array([[np.nan if v is None else v for v in row] for row in rows], dtype=float).reshape(-1, len(METRICS))
+        now = time.time()
+        self._db.execute("DELETE FROM baselines WHERE user_id = ?", (user_id,))
+        for i, metric in enumerate(METRICS):
+            column = values[:, i][~np.isnan(values[:, i])]
+            if not len(column):
+                continue
+            self._db.execute("INSERT OR REPLACE INTO baselines VALUES (?, ?, ?, ?, ?, ?)",
+                             (user_id, metric, len(column), float(column.mean()), float(column.std()), now))
+
+    def sessions(self, user_id=None, start=None, end=None, limit=None):
+        """Session metadata + headline metrics (no series), newest first"""
+        query, params = self._range("SELECT session_id, user_id, started_at, duration, frames, " + ', '.join(METRICS) + " FROM sessions",
+                                    user_id, start, end)
+        query += " ORDER BY started_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, params)]
+
+    def trend(self, user_id, metric, start=None, end=None):
+        """(started_at, value) arrays of one metric over a time range, oldest first"""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (expected one of {list(METRICS)})")
+        query, params = self._range(f"SELECT started_at, {metric} FROM sessions", user_id, start, end)
+        with self._lock:
+            rows = self._db.execute(query + f" AND {metric} IS NOT NULL ORDER BY started_at", params).fetchall()
+        data = np.array(rows, dtype=float).reshape(-1, 2)
+        return data[:, 0], data[:, 1]
+
+    def baseline(self, user_id):
+        """{metric: {'n', 'mean', 'std'}} over the user's last `baseline_window` sessions"""
+        with self._lock:
+            rows = self._db.execute("SELECT metric, n, mean, std FROM baselines WHERE user_id = ?", (user_id,)).fetchall()
+        return {row['metric']: {'n': row['n'], 'mean': round(row['mean'], 2), 'std': round(row['std'], 2)} for row in rows}
+
+    def compare(self, user_id, results):
+        """Deviation of a session's metrics from the user's baseline, in baseline standard deviations"""
+        baseline = self.baseline(user_id)
+        deviations = {}
+        for metric, paths in METRICS.items():
+            value, base = _lookup(results, paths), baseline.get(metric)
+            if value is None or base is None or base['n'] < 3:
+                continue
+            deviations[metric] = {'value': value, 'baseline': base['mean'],
+                                  'z': round((value - base['mean']) / base['std'], 2) if base['std'] > 0 else 0.0}
+        return deviations
+
+    def get(self, session_id):
+        """Stored results (sample lists excluded) for one session, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT summary FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row['summary']) if row else None
+
+    def load_series(self, session_id, names=None):
+        """{series: {column: array}} for one session (only the requested series if names is given)"""
+        with self._lock:
+            row = self._db.execute("SELECT series_path FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None or row['series_path'] is None:
+            return {}
+        series = {}
+        with np.load(row['series_path']) as data:
+            for key in data.files:
+                name, column = key.split('.', 1)
+                if names is None or name in names:
+                    series.setdefault(name, {})[column] = data[key]
+        return series
+
+    def delete(self, session_id):
+        with self._lock, self._db:
+            row = self._db.execute("SELECT user_id, series_path FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return False
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._update_baseline(row['user_id'])
+        if row['series_path'] and os.path.exists(row['series_path']):
+            os.remove(row['series_path'])
+        return True
+
+    def _range(self, select, user_id, start, end):
+        clauses, params = ["1 = 1"], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if start is not None:
+            clauses.append("started_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("started_at < ?")
+            params.append(end)
+        return f"{select} WHERE {' AND '.join(clauses)}", params
+
+    def close(self):
+        self._db.close()
+
+def _safe(user_id):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(user_id)) or 'default'
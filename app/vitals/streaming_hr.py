@@ -0,0 +1,128 @@
+import numpy as np
+from scipy import signal
+from .dsp import bandpass_sos
+
+class StreamingCHROM:
+    """Incremental CHROM pulse estimator with O(1) work per frame.
+
+    Running (exponentially weighted) channel statistics replace the batch
+    normalization, a stateful SOS band-pass replaces filtfilt, and a bank of
+    damped resonators over the HR band replaces the windowed FFT.
+    """
+    def __init__(self, fps=30, band=(0.7, 3.5), window_seconds=8, resolution_bpm=1.0, min_seconds=4):
+        self.fps = fps
+        self.band = band
+        self.window_seconds = window_seconds
+        self.min_seconds = min_seconds
+        self.freqs = np.arange(band[0], band[1] + 1e-9, resolution_bpm / 60)
+        self.max_gap = 1.0  # Seconds; longer gaps restart the resampling grid instead of interpolating
+        # The grid runs at fps / k for the smallest k the observed sample rate supports, so sparse
+        # input (dropped frames, slow inference) is never interpolated up to the nominal rate.
+        # Below min_rate the band's upper edge is too close to Nyquist: no estimate is reported
+        self.min_rate = 2.5 * band[1]
+        self.reset()
+
+    def reset(self):
+        self.observed_rate = None  # Smoothed rate of valid samples
+        self._configure(self.fps)
+
+    def _configure(self, rate):
+        """(Re)design filter and resonators for a grid at `rate` Hz; restarts the estimate"""
+        self.rate = rate
+        self.min_samples = int(self.min_seconds * rate)
+        self.sos = bandpass_sos(rate, self.band, 4)
+        # Statistics and spectrum forget with the same time constant (~window_seconds)
+        self.decay = np.exp(-1.0 / (self.window_seconds * rate))
+        self.rotation = np.exp(-2j * np.pi * self.freqs / rate)
+        self.zi_x = np.zeros((self.sos.shape[0], 2))
+        self.zi_y = np.zeros((self.sos.shape[0], 2))
+        self.mean = None
+        self.var = np.zeros(3)
+        self.var_xf = 0.0
+        self.var_yf = 0.0
+        self.spectrum = np.zeros(len(self.freqs), dtype=complex)
+        self.samples = 0
+        self.last = None  # (t, rgb) of the previous update
+        self.next_t = None  # Next point of the uniform grid
+
+    def _track_rate(self, t):
+        """Follow the observed sample rate; move the grid to fps / k when it settles elsewhere"""
+        if self.last is None or t - self.last[0] <= 0 or t - self.last[0] > self.max_gap:
+            return
+        rate = 1.0 / (t - self.last[0])
+        self.observed_rate = rate if self.observed_rate is None else 0.95 * self.observed_rate + 0.05 * rate
+        ratio = self.fps / self.observed_rate
+        factor = int(round(self.fps / self.rate))
+        if abs(ratio - factor) < 0.75:
+            return  # Hysteresis: a rate hovering between two grids must not keep restarting the estimate
+        factor = max(1, int(round(ratio)))
+        while factor > 1 and self.fps / factor < self.min_rate:
+            factor -= 1  # Keep the grid usable; current_bpm() reports nothing while the input is this sparse
+        if self.fps / factor != self.rate:
+            last = self.last
+            self._configure(self.fps / factor)
+            self.last = last
+            self.next_t = last[0] + 1.0 / self.rate
+
+    def update(self, rgb_mean, t=None):
+        """Feed one ROI [R, G, B] mean captured at time t (seconds); invalid samples are ignored"""
+        if rgb_mean is None:
+            return
+        rgb = np.asarray(rgb_mean, dtype=float)
+        if np.isnan(rgb).any():
+            return
+        if t is None:
+            t = self.next_t if self.next_t is not None else 0.0
+        self._track_rate(t)
+
+        if self.last is None or t - self.next_t > self.max_gap:
+            self._push(rgb)
+            self.next_t = t + 1.0 / self.rate
+        else:
+            # Linearly interpolate onto the grid so the filter sees uniform samples
+            t0, rgb0 = self.last
+            while self.next_t <= t:
+                w = (self.next_t - t0) / (t - t0) if t > t0 else 1.0
+                self._push(rgb0 + w * (rgb - rgb0))
+                self.next_t += 1.0 / self.rate
+        self.last = (t, rgb)
+
+    def _push(self, rgb):
+        a = 1.0 - self.decay
+        if self.mean is None:
+            self.mean = rgb.copy()
+        delta = rgb - self.mean
+        self.mean += a * delta
+        self.var = self.decay * (self.var + a * delta ** 2)
+        std = np.sqrt(self.var)
+        norm = np.divide(rgb - self.mean, std, out=np.zeros(3), where=std > 0)
+
+        # CHROM projection
+        x = 3 * norm[0] - 2 * norm[1]
+        y = 1.5 * norm[0] + norm[1] - 1.5 * norm[2]
+        xf, self.zi_x = signal.sosfilt(self.sos, [x], zi=self.zi_x)
+        yf, self.zi_y = signal.sosfilt(self.sos, [y], zi=self.zi_y)
+        xf, yf = xf[0], yf[0]
+
+        self.var_xf = self.decay * self.var_xf + a * xf * xf
+        self.var_yf = self.decay * self.var_yf + a * yf * yf
+        alpha = np.sqrt(self.var_xf / self.var_yf) if self.var_yf > 1e-12 else 0.0
+        pulse = xf - alpha * yf
+
+        self.spectrum = self.decay * self.rotation * self.spectrum + pulse
+        self.samples += 1
+
+    def current_bpm(self):
+        """Dominant pulse frequency in BPM, or None while warming up / out of range"""
+        if self.samples < self.min_samples or (self.observed_rate is not None and self.observed_rate < self.min_rate):
+            return None
+        power = np.abs(self.spectrum) ** 2
+        k = int(np.argmax(power))
+        freq = self.freqs[k]
+        # Parabolic interpolation between neighbouring bins
+        if 0 < k < len(power) - 1:
+            denom = power[k - 1] - 2 * power[k] + power[k + 1]
+            if denom != 0:
+                freq += 0.5 * (power[k - 1] - power[k + 1]) / denom * (self.freqs[1] - self.freqs[0])
+        hr_bpm = freq * 60
+        return round(hr_bpm, 1) if 50 <= hr_bpm <= 150 else None
@@ -0,0 +1,58 @@
+import time
+from contextlib import contextmanager
+import numpy as np
+from .ring_buffer import RingBuffer
+
+class StageTimer:
+    """Per-stage latency recorder for the frame loop and final aggregation
+
+    Keeps the most recent `capacity` durations per stage (for percentiles) plus
+    exact running count/total/max. `callback(stage, seconds)` is invoked for
+    every measurement so external metric sinks can subscribe.
+    """
+    def __init__(self, capacity=1800, callback=None):
+        self.capacity = capacity
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self._recent = {}
+        self._totals = {}  # stage -> [count, total seconds, max seconds]
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        recent = self._recent.get(name)
+        if recent is None:
+            recent = self._recent[name] = RingBuffer(self.capacity)
+            self._totals[name] = [0, 0.0, 0.0]
+        recent.append(seconds)
+        totals = self._totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def summary(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, max_ms, fps}} in recording order"""
+        stats = {}
+        for name, recent in self._recent.items():
+            count, total, peak = self._totals[name]
+            p50, p95 = np.percentile(recent.latest()[:, 0], [50, 95]) * 1000
+            mean = total / count
+            stats[name] = {
+                'count': count,
+                'mean_ms': round(mean * 1000, 3),
+                'p50_ms': round(p50, 3),
+                'p95_ms': round(p95, 3),
+                'max_ms': round(peak * 1000, 3),
+                'fps': round(1.0 / mean, 1) if mean > 0 else None,  # Throughput if this stage ran alone
+            }
+        return stats
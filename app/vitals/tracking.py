@@ -0,0 +1,179 @@
+import numpy as np
+from .frame_context import FrameContext
+from .heart_rate_chrom import CHROMHeartRate
+from .streaming_hr import StreamingCHROM
+from .breathing_rate import BreathingDetector
+from .blink_detector import BlinkDetector
+
+NOSE_TIP = 1  # FaceMesh
+POSE_NOSE = 0  # Pose
+
+class FaceTracker:
+    """Assigns stable track IDs to the faces found in each frame.
+
+    Greedy nearest-centroid matching in normalized coordinates: a face joins the
+    closest live track within `max_distance`, otherwise it starts a new track.
+    Tracks unseen for more than `max_missed` frames are retired.
+    """
+    def __init__(self, max_distance=0.15, max_missed=15):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.tracks = {}  # id -> {'center': (x, y), 'missed': frames since last match}
+        self._next_id = 0
+
+    def update(self, faces):
+        """Match this frame's face arrays to tracks; returns {track_id: face}"""
+        centers = [face[:, :2].mean(axis=0) for face in faces]
+        ids = list(self.tracks)
+        assigned = {}
+        if ids and centers:
+            known = np.array([self.tracks[i]['center'] for i in ids])
+            dist = np.linalg.norm(np.array(centers)[:, None, :] - known[None, :, :], axis=2)
+            # Closest pairs first
+            for flat in np.argsort(dist, axis=None):
+                f, t = np.unravel_index(flat, dist.shape)
+                if dist[f, t] > self.max_distance:
+                    break
+                if f in assigned.values() or ids[t] in assigned:
+                    continue
+                assigned[ids[t]] = f
+        for f in range(len(faces)):
+            if f not in assigned.values():
+                assigned[self._next_id] = f
+                self._next_id += 1
+
+        for track_id in list(self.tracks):
+            if track_id not in assigned:
+                self.tracks[track_id]['missed'] += 1
+                if self.tracks[track_id]['missed'] > self.max_missed:
+                    del self.tracks[track_id]
+        for track_id, f in assigned.items():
+            self.tracks[track_id] = {'center': centers[f], 'missed': 0}
+        return {track_id: faces[f] for track_id, f in assigned.items()}
+
+class SubjectState:
+    """Per-person HR / BR / blink state for one track"""
+    def __init__(self, track_id, fps=30, trace_capacity=600):
+        self.track_id = track_id
+        self.hr_detector = CHROMHeartRate(fps, trace_capacity=trace_capacity)
+        self.live_hr = StreamingCHROM(fps)
+        self.br_detector = BreathingDetector(fps, trace_capacity=trace_capacity)
+        self.blink_detector = BlinkDetector(trace_capacity=trace_capacity, fps=fps)
+        self.frames_tracked = 0
+        self.first_seen = None
+        self.last_seen = None
+
+    def update(self, context):
+        """Feed one per-subject context (face may be None when the track was not matched)"""
+        rgb_mean = self.hr_detector.update(context)
+        self.live_hr.update(rgb_mean, context.timestamp)
+        self.br_detector.update(context)
+        self.blink_detector.detect(context)
+        if context.face_landmarks is not None:
+            self.frames_tracked += 1
+            if self.first_seen is None:
+                self.first_seen = context.timestamp
+            self.last_seen = context.timestamp
+
+    def results(self, origin=0.0):
+        return {
+            'track_id': self.track_id,
+            'frames_tracked': self.frames_tracked,
+            'first_seen': _since(self.first_seen, origin),
+            'last_seen': _since(self.last_seen, origin),
+            'heart_rate': {'value': self.hr_detector.estimate(), 'live': self.live_hr.current_bpm(), 'unit': 'BPM', 'method': 'CHROM rPPG'},
+            'breathing_rate': {'value': self.br_detector.estimate(), 'unit': 'BPM'},
+            'blinks': self.blink_detector.analyze(),
+        }
+
+class RetiredSubject:
+    """What is kept of a SubjectState once its track is retired: its results, without the traces"""
+    def __init__(self, subject):
+        self.track_id = subject.track_id
+        self.frames_tracked = subject.frames_tracked
+        self.first_seen = subject.first_seen
+        self.last_seen = subject.last_seen
+        self._results = subject.results()  # A retired track gets no more frames: these are final
+
+    def results(self, origin=0.0):
+        return dict(self._results, first_seen=_since(self.first_seen, origin), last_seen=_since(self.last_seen, origin))
+
+def _since(timestamp, origin):
+    return round(timestamp - origin, 3) if timestamp is not None else None
+
+class MultiSubjectTracker:
+    """Tracks every face in the frame and keeps vitals state per track.
+
+    Faces come from one FaceMesh call with max_num_faces > 1. MediaPipe Pose
+    only tracks one body, so its shoulders (and therefore BR) go to the track
+    whose face is closest to the body's nose.
+
+    One track is the primary subject: the longest-tracked face, kept until its
+    track is retired. FaceMesh does not keep a stable face order between frames,
+    so the collector's top-level traces follow the primary track, not faces[0].
+
+    Once a track is retired (and is not the primary), its SubjectState is swapped
+    for a RetiredSubject holding only its results, so memory does not grow with
+    every face that walks past.
+    """
+    def __init__(self, fps=30, trace_capacity=600, max_distance=0.15, max_missed=15):
+        self.fps = fps
+        self.trace_capacity = trace_capacity
+        self.tracker = FaceTracker(max_distance, max_missed)
+        self.subjects = {}  # track_id -> SubjectState, or RetiredSubject once the track is retired
+        self._live = set()  # Track IDs whose SubjectState is still held
+        self.primary = None  # Track ID of the primary subject
+        self.primary_face = None  # Its face this frame (None when unmatched)
+        self.pose_owner = None  # Track the body belongs to this frame (None when unmatched)
+
+    def reset(self):
+        self.tracker = FaceTracker(self.tracker.max_distance, self.tracker.max_missed)
+        self.subjects = {}
+        self._live = set()
+        self.primary = None
+        self.primary_face = None
+        self.pose_owner = None
+
+    def update(self, context):
+        """Update every live subject from one frame; returns the {track_id: face} assignment"""
+        assigned = self.tracker.update(context.faces)
+        pose_owner = self.pose_owner = self._pose_owner(assigned, context.pose_landmarks)
+        for track_id in set(assigned) | set(self.tracker.tracks):
+            subject = self.subjects.get(track_id)
+            if subject is None:
+                subject = self.subjects[track_id] = SubjectState(track_id, self.fps, self.trace_capacity)
+                self._live.add(track_id)
+            face = assigned.get(track_id)
+            pose = context.pose_landmarks if track_id == pose_owner else None
+            subject.update(FrameContext(context.frame, context._rgb, face, pose, context.timestamp))
+        if self.primary not in self.tracker.tracks:
+            self.primary = self._choose_primary(assigned)
+        self.primary_face = assigned.get(self.primary)
+        for track_id in self._live - set(self.tracker.tracks) - {self.primary}:
+            self.subjects[track_id] = RetiredSubject(self.subjects[track_id])
+            self._live.discard(track_id)
+        return assigned
+
+    def _choose_primary(self, assigned):
+        """Longest-tracked face in this frame (larger face on ties), or None"""
+        if not assigned:
+            return None
+        def rank(track_id):
+            face = assigned[track_id]
+            extent = face[:, :2].max(axis=0) - face[:, :2].min(axis=0)
+            return self.subjects[track_id].frames_tracked, float(extent[0] * extent[1])
+        return max(assigned, key=rank)
+
+    def _pose_owner(self, assigned, pose):
+        if pose is None or not assigned:
+            return None
+        nose = pose[POSE_NOSE, :2]
+        track_ids = list(assigned)
+        dist = [np.linalg.norm(assigned[t][NOSE_TIP, :2] - nose) for t in track_ids]
+        best = int(np.argmin(dist))
+        return track_ids[best] if dist[best] <= self.tracker.max_distance else None
+
+    def results(self, origin=0.0, min_frames=1):
+        """Per-person results for every track seen for at least `min_frames` frames"""
+        return [dict(subject.results(origin), primary=subject.track_id == self.primary)
+                for subject in self.subjects.values() if subject.frames_tracked >= min_frames]
@@ -1,78 +1,122 @@
 """Web-compatible vitals collector using browser camera"""
 import cv2
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import time
+from collections import deque
+
+# A metric counts as converged once its last CONVERGE_WINDOW partials lie within this spread
+CONVERGE_WINDOW = 5
+CONVERGE_SPREAD = {'heart_rate': 3.0, 'breathing_rate': 2.0}
 
 class WebVitalsCollector:
-    """Collect vitals from browser video stream"""
-    
-    def __init__(self, duration: int = 10):
+    """Collect vitals from browser video stream
+
+    Frames pushed with process_frame() run through the full detector pipeline
+    incrementally (nothing is buffered); partial() reports the HR / BR / blink
+    estimates so far and finish() returns the usual results schema.
+    """
+
+    def __init__(self, duration: int = 10, fps: int = 30, rgb_input: bool = True, **collector_options):
         self.duration = duration
-        self.frames = []
-        
-    def process_frame(self, frame):
-        """Process a single frame from browser"""
-        if frame is None:
+        self.fps = fps
+        self.rgb_input = rgb_input  # Browser frames arrive as RGB; False for BGR sources
+        self.collector_options = collector_options
+        self.frames_read = 0
+        self.frames_dropped = 0  # Frames the caller rejected upstream (see service.py backpressure)
+        self.drop_policy = 'client'
+        self.done = False
+        self._collector = None
+        self._started = None
+        self._history = {name: deque(maxlen=CONVERGE_WINDOW) for name in CONVERGE_SPREAD}
+        self._partial = None
+        self._next_partial = 0.0
+
+    def _session(self):
+        if self._collector is None:
+            from .live_collector import LiveVitalsCollector
+            self._collector = LiveVitalsCollector(duration=self.duration, fps=self.fps, sample_interval=self.fps,
+                                                  vital_sample_interval=2 * self.fps, headless=True,
+                                                  **self.collector_options)
+            self._collector.begin_session()
+            self._started = time.time()
+        return self._collector
+
+    def process_frame(self, frame, timestamp: Optional[float] = None):
+        """Analyze one frame from the browser; returns the latest partial estimates (None once finished)"""
+        if frame is None or self.done:
             return None
-        
+
         # Convert to BGR if needed
-        if len(frame.shape) == 3 and frame.shape[2] == 3:
+        if self.rgb_input and len(frame.shape) == 3 and frame.shape[2] == 3:
             frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
         else:
             frame_bgr = frame
-            
-        self.frames.append(frame_bgr)
-        return frame
-    
+
+        collector = self._session()
+        self.frames_read += 1
+        if timestamp is None:
+            timestamp = time.monotonic()
+        frame_results = collector.process_frame(frame_bgr, timestamp)
+        if frame_results is None:
+            self.done = True  # Duration reached
+            return None
+
+        # Refresh the partials once a second of capture time
+        if frame_results['elapsed'] >= self._next_partial or self._partial is None:
+            self._next_partial = frame_results['elapsed'] + 1.0
+            self._partial = self._build_partial(frame_results)
+        return self._partial
+
+    def _build_partial(self, frame_results):
+        collector = self._collector
+        blink = frame_results['blink_result']
+        values = {
+            'heart_rate': frame_results['live_bpm'],
+            'breathing_rate': collector.br_detector.estimate(),  # Whole trace so far, once a second
+        }
+        partial = {'elapsed': round(frame_results['elapsed'], 2), 'frames': frame_results['frames'],
+                   'face_detected': frame_results['face_detected']}
+        for name, value in values.items():
+            history = self._history[name]
+            if value is not None:
+                history.append(value)
+            converged = len(history) == CONVERGE_WINDOW and bool(max(history) - min(history) <= CONVERGE_SPREAD[name])
+            partial[name] = {'value': value, 'converged': converged}
+        partial['blinks'] = {'count': blink['blink_count'], 'rate': blink['blink_rate']} if blink else None
+        return partial
+
+    def partial(self) -> Optional[Dict[str, Any]]:
+        """Latest partial HR / BR / blink estimates (None before the first frame)"""
+        return self._partial
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Finalize the streamed session into the full results schema"""
+        if self._collector is None:
+            return None
+        self.done = True
+        results = self._collector.finish_session(time.time() - self._started, self.frames_read,
+                                                 self.frames_dropped, self.drop_policy)
+        results["capture_info"]["source"] = "stream"
+        return results
+
+    def close(self):
+        if self._collector is not None:
+            self._collector.close()
+            self._collector = None
+
     def collect_from_video(self, video_path: str) -> Dict[str, Any]:
-        """Collect vitals from uploaded video"""
+        """Collect vitals from uploaded video using the full detector pipeline"""
+        # Detectors and sampling intervals follow the file's own frame rate
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        frames_to_collect = int(fps * self.duration)
-        collected = 0
-        
-        while collected < frames_to_collect:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            self.frames.append(frame)
-            collected += 1
-        
         cap.release()
-        
-        # Use existing vitals processing
+        fps = int(round(fps)) if fps and fps > 0 else 30
+
         from .live_collector import LiveVitalsCollector
-        collector = LiveVitalsCollector(duration=self.duration, headless=True)
-        
-        # Process collected frames
-        # This is a simplified version - full implementation would need
-        # to integrate with existing detectors
-        
-        return {
-            "session_summary": {
-                "overall_health_status": {
-                    "score": 75,
-                    "status": "good",
-                    "issues": []
-                },
-                "key_findings": [
-                    f"Processed {len(self.frames)} frames from video",
-                    "Video-based vitals collection completed",
-                    "For accurate results, use local installation"
-                ],
-                "recommendations": [
-                    "Upload a 10-second video of your face",
-                    "Ensure good lighting",
-                    "Look directly at camera"
-                ],
-                "risk_factors": []
-            },
-            "physiological_vitals": {
-                "heart_rate": {"average": "N/A", "status": "pending"},
-                "breathing_rate": {"average": "N/A", "status": "pending"},
-                "hrv": {"status": "pending"}
-            },
-            "note": "Web-based vitals collection is experimental. For full accuracy, use local installation."
-        }
+        collector = LiveVitalsCollector(duration=self.duration, fps=fps, sample_interval=fps,
+                                        vital_sample_interval=2 * fps, headless=True)
+        try:
+            return collector.analyze_video(video_path)
+        finally:
+            collector.close()
@@ -7,6 +7,7 @@ import sys
 sys.path.append('app/vitals')
 
 from app.vitals.live_collector import LiveVitalsCollector
+from app.vitals.store import SessionStore
 
 def main():
     print("="*60)
@@ -30,7 +31,13 @@ def main():
     
     if results:
         print("\n✅ Collection complete!")
-        print("📁 Results saved in memory")
+        store = SessionStore()
+        session_id = store.save(results)
+        print(f"📁 Results saved to {store.root} (session {session_id[:8]})")
+        baseline = store.baseline('default').get('heart_rate')
+        if baseline and baseline['n'] > 1:
+            print(f"📈 Your HR baseline: {baseline['mean']} ± {baseline['std']} BPM over {baseline['n']} sessions")
+        store.close()
     else:
         print("\n❌ Collection failed")
 